@@ -0,0 +1,169 @@
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+import data_loader
+import profile_cache
+from simulation import Simulation
+from evaluation import get_results_parameter
+from components.serializable import Serializable
+
+
+# Component parameter files used by Simulation
+component_files = ['data/components/route_profile.json',
+                   'data/components/battery_management.json',
+                   'data/components/battery_lfp.json',
+                   'data/components/charger_ac.json']
+
+
+def init_worker(vehicle_files, profile_cache_directory=None, drivecycle_persist=False):
+    '''
+    Worker initializer: loads shared read only inputs (component json files, drive cycle) once per worker process
+    Loaded files are cached by Serializable.load and data_loader.drivecycle_store
+
+    Parameters
+    ----------
+    vehicle_files: list of json files. Vehicle parameter files
+    profile_cache_directory: str. Directory of on-disk route profile cache, None for memory only
+    drivecycle_persist: bool. Write/read .npy sidecar files of drive cycles (see data_loader.DriveCycleStore)
+    '''
+    profile_cache.default_cache.directory = profile_cache_directory
+    data_loader.drivecycle_store.persist = drivecycle_persist
+
+    for file_path in component_files + list(vehicle_files):
+        Serializable().load(file_path)
+
+    route_profile = Serializable()
+    route_profile.load('data/components/route_profile.json')
+    data_loader.DriveCycle().read_csv(route_profile.drivecycle_file)
+
+
+def simulate_tour(task):
+    '''
+    Simulates one tour with one vehicle specification
+
+    Parameters
+    ----------
+    task: tuple. (tour_id, data_route, vehicle_file, vectorized)
+
+    Returns
+    -------
+    dict: tour id, vehicle specification and evaluation parameters (see evaluation.get_results_parameter)
+    '''
+    tour_id, data_route, vehicle_file, vectorized = task
+
+    sim = Simulation(data_route, vehicle_file=vehicle_file, profile_cache=profile_cache.default_cache)
+    if vectorized:
+        sim.simulate_vectorized()
+    else:
+        sim.simulate()
+
+    results_parameter = {'tour': tour_id,
+                         'specification': sim.vehicle.specification}
+    results_parameter.update(get_results_parameter(sim))
+
+    return results_parameter
+
+
+class Batch:
+    '''
+    Batch simulation of many tours and vehicle specifications with a process pool
+
+    Attributes
+    ----------
+    tours: dict or list of dicts. Route parameters of tours (see Simulation), dict keys are used as tour ids
+    vehicle_files: list of json files. Vehicle parameter files, each tour is simulated with each vehicle
+    max_workers: int. Number of worker processes, None for number of CPUs, 1 to simulate in current process
+    chunksize: int. Number of tasks sent to a worker at once, None for automatic chunking
+    vectorized: bool. Use Simulation.simulate_vectorized instead of step simulation
+    profile_cache_directory: str. Directory of on-disk route profile cache, None for memory only
+    drivecycle_persist: bool. Write/read .npy sidecar files of drive cycles
+
+    Methods
+    -------
+    get_tasks
+    simulate
+    '''
+
+    def __init__(self, tours, vehicle_files=('data/components/vehicle_electric.json',),
+                 max_workers=None, chunksize=None, vectorized=True, profile_cache_directory=None,
+                 drivecycle_persist=False):
+        '''
+        Parameters
+        ----------
+        tours: dict or list of dicts. Route parameters of tours, each with:
+            distance_there, distance_back, distance_collection: float [m]
+            stops_sum, containers_sum: int [1]
+            container_mass: float [kg]
+            overall_distance: float [m], optional (sum of distances if not given)
+        vehicle_files: list of json files. Vehicle parameter files
+        max_workers: int. Number of worker processes
+        chunksize: int. Number of tasks sent to a worker at once
+        vectorized: bool. Use vectorized simulation
+        profile_cache_directory: str. Directory of on-disk route profile cache
+        drivecycle_persist: bool. Write/read .npy sidecar files of drive cycles
+        '''
+        if not isinstance(tours, dict):
+            tours = dict(enumerate(tours))
+
+        self.tours = tours
+        self.vehicle_files = list(vehicle_files)
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+        self.chunksize = chunksize
+        self.vectorized = vectorized
+        self.profile_cache_directory = profile_cache_directory
+        self.drivecycle_persist = drivecycle_persist
+
+
+    def get_tasks(self):
+        '''
+        Method creates simulation tasks for all combinations of tours and vehicle files
+
+        Parameters
+        ----------
+        None
+        '''
+        tasks = list()
+        for tour_id, data_route in self.tours.items():
+            data_route = dict(data_route)
+            # Overall distance is needed for specific energy
+            if 'overall_distance' not in data_route:
+                data_route['overall_distance'] = data_route['distance_there'] + data_route['distance_collection'] \
+                                                 + data_route['distance_back']
+
+            for vehicle_file in self.vehicle_files:
+                tasks.append((tour_id, data_route, vehicle_file, self.vectorized))
+
+        return tasks
+
+
+    def simulate(self):
+        '''
+        Method simulates all tasks, distributed over worker processes in chunks
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: evaluation parameters of all tours, indexed by tour and specification
+        '''
+        tasks = self.get_tasks()
+
+        if self.max_workers == 1:
+            init_worker(self.vehicle_files, self.profile_cache_directory, self.drivecycle_persist)
+            results = [simulate_tour(task) for task in tasks]
+
+        else:
+            # Several chunks per worker to balance different tour lengths
+            chunksize = self.chunksize if self.chunksize else max(1, math.ceil(len(tasks) / (4 * self.max_workers)))
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     initializer=init_worker,
+                                     initargs=(self.vehicle_files, self.profile_cache_directory,
+                                               self.drivecycle_persist)) as executor:
+                results = list(executor.map(simulate_tour, tasks, chunksize=chunksize))
+
+        return pd.DataFrame(results).set_index(['tour', 'specification'])
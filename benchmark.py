@@ -0,0 +1,243 @@
+import argparse
+import contextlib
+import io
+import json
+import time
+import tracemalloc
+
+import pandas as pd
+
+from components.route import Route
+from simulation import Simulation
+from evaluation import get_results_powerflows, get_results_parameter
+
+
+# Vehicle parameter files of benchmarked specifications
+benchmark_vehicle_files = ['data/components/vehicle_electric.json',
+                           'data/components/vehicle_diesel.json']
+
+# Synthetic tour sizes: (stops_sum [1], transfer distance there and back [km])
+benchmark_sizes = [(50, 10),
+                   (200, 25),
+                   (500, 50),
+                   (1000, 100),
+                   (2000, 200)]
+
+# Benchmarked stages, in order of MAIN.py
+benchmark_stages = ['route', 'simulate', 'simulate_vectorized', 'evaluation']
+
+
+def get_tour(stops_sum, transfer_distance):
+    '''
+    Synthetic tour data, scaled from sample tour data/load/tour.pkl (115 stops, 25 km collection, 250 containers)
+
+    Parameters
+    ----------
+    stops_sum: int [1]. Number of stops of route
+    transfer_distance: float [km]. Sum of transfer drive distances to and from collection
+
+    Returns
+    -------
+    dict: route parameters (see Simulation)
+    '''
+    data_route = {'stops_sum': stops_sum,
+                  'containers_sum': round(stops_sum * 250 / 115),
+                  'container_mass': 35,
+                  'distance_there': transfer_distance * 1000 / 2,
+                  'distance_back': transfer_distance * 1000 / 2,
+                  'distance_collection': stops_sum * 25000 / 115}
+    data_route['overall_distance'] = data_route['distance_there'] + data_route['distance_collection'] \
+                                     + data_route['distance_back']
+
+    return data_route
+
+
+def run_stage(stage, data_route, vehicle_file, route):
+    '''
+    Runs one benchmark stage, component messages are suppressed
+
+    Parameters
+    ----------
+    stage: str. Benchmark stage
+    data_route: dict. Route parameters
+    vehicle_file: json file. Vehicle parameter file
+    route: Route. Synthesized route, reused by simulation and evaluation stages
+
+    Returns
+    -------
+    Route or Simulation: result of stage
+    '''
+    with contextlib.redirect_stdout(io.StringIO()):
+        if stage == 'route':
+            route = Route(timestep=1, data_route=data_route, file_path='data/components/route_profile.json')
+            route.get_profile()
+            return route
+
+        sim = Simulation(data_route, vehicle_file=vehicle_file, route=route)
+        if stage == 'simulate':
+            sim.simulate()
+        elif stage == 'simulate_vectorized':
+            sim.simulate_vectorized()
+        elif stage == 'evaluation':
+            sim.simulate_vectorized()
+            # Only post-processing is timed
+            start = time.perf_counter()
+            get_results_powerflows(sim)
+            get_results_parameter(sim)
+            sim.evaluation_time = time.perf_counter() - start
+        else:
+            raise ValueError('Unknown benchmark stage ' + stage + ', use one of ' + str(benchmark_stages))
+
+        return sim
+
+
+def benchmark_case(data_route, vehicle_file, stages=benchmark_stages, repeat=3, memory=True):
+    '''
+    Benchmarks all stages of one tour and vehicle specification
+
+    Parameters
+    ----------
+    data_route: dict. Route parameters
+    vehicle_file: json file. Vehicle parameter file
+    stages: list of str. Benchmark stages
+    repeat: int. Number of timed runs of each stage, minimum wall time is reported
+    memory: bool. Measure peak memory with tracemalloc in an additional untimed run
+
+    Returns
+    -------
+    list of dicts: stage, timesteps, wall time [s], time per timestep [us] and peak memory [MB]
+    '''
+    # Warm up caches (json files, drive cycle, compiled battery kernel) and synthesize route for simulation stages
+    route = run_stage('route', data_route, vehicle_file, None)
+    run_stage('simulate_vectorized', data_route, vehicle_file, route)
+    timesteps = len(route.profile_day)
+
+    results = list()
+    for stage in stages:
+        times = list()
+        for i in range(repeat):
+            start = time.perf_counter()
+            result = run_stage(stage, data_route, vehicle_file, route)
+            times.append(result.evaluation_time if stage == 'evaluation' else time.perf_counter() - start)
+
+        peak_memory = float('nan')
+        if memory:
+            tracemalloc.start()
+            run_stage(stage, data_route, vehicle_file, route)
+            peak_memory = tracemalloc.get_traced_memory()[1] / 1e6
+            tracemalloc.stop()
+
+        results.append({'stage': stage,
+                        'timesteps': timesteps,
+                        'time': min(times),
+                        'time_per_timestep_us': min(times) / timesteps * 1e6,
+                        'peak_memory_mb': peak_memory})
+
+    return results
+
+
+def benchmark(sizes=benchmark_sizes, vehicle_files=benchmark_vehicle_files, stages=benchmark_stages,
+              repeat=3, memory=True):
+    '''
+    Benchmarks all synthetic tour sizes and vehicle specifications
+
+    Parameters
+    ----------
+    sizes: list of tuples. (stops_sum [1], transfer distance [km])
+    vehicle_files: list of json files. Vehicle parameter files
+    stages: list of str. Benchmark stages
+    repeat: int. Number of timed runs of each stage
+    memory: bool. Measure peak memory
+
+    Returns
+    -------
+    DataFrame: benchmark results, indexed by case and stage
+    '''
+    results = list()
+    for vehicle_file in vehicle_files:
+        specification = vehicle_file.split('/')[-1].replace('.json', '')
+        for stops_sum, transfer_distance in sizes:
+            case = specification + '_' + str(stops_sum) + 'stops_' + str(transfer_distance) + 'km'
+            for result in benchmark_case(get_tour(stops_sum, transfer_distance), vehicle_file, stages, repeat, memory):
+                result['case'] = case
+                results.append(result)
+
+    return pd.DataFrame(results).set_index(['case', 'stage'])
+
+
+def save_baseline(results, file_name):
+    '''
+    Saves benchmark results as baseline json file
+
+    Parameters
+    ----------
+    results: DataFrame. Benchmark results
+    file_name: str. Baseline json file
+    '''
+    baseline = {case + '/' + stage: row.to_dict() for (case, stage), row in results.iterrows()}
+    with open(file_name, 'w') as json_file:
+        json.dump(baseline, json_file, indent=4)
+
+
+def compare_baseline(results, file_name, tolerance=0.2):
+    '''
+    Compares benchmark results with baseline, wall time or peak memory above baseline * (1 + tolerance)
+    is a regression. Cases not contained in baseline are skipped
+
+    Parameters
+    ----------
+    results: DataFrame. Benchmark results
+    file_name: str. Baseline json file
+    tolerance: float [1]. Relative tolerance
+
+    Returns
+    -------
+    DataFrame: regressions with baseline and current values
+    '''
+    with open(file_name, 'r') as json_file:
+        baseline = json.load(json_file)
+
+    regressions = list()
+    for (case, stage), row in results.iterrows():
+        reference = baseline.get(case + '/' + stage)
+        if reference is None:
+            continue
+        for metric in ['time', 'peak_memory_mb']:
+            if row[metric] > reference[metric] * (1 + tolerance):
+                regressions.append({'case': case,
+                                    'stage': stage,
+                                    'metric': metric,
+                                    'baseline': reference[metric],
+                                    'current': row[metric],
+                                    'ratio': row[metric] / reference[metric]})
+
+    return pd.DataFrame(regressions, columns=['case', 'stage', 'metric', 'baseline', 'current', 'ratio'])
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark of route synthesis, simulation and evaluation')
+    parser.add_argument('--stages', nargs='+', default=benchmark_stages, choices=benchmark_stages)
+    parser.add_argument('--max-stops', type=int, default=None, help='Skip tour sizes with more stops')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--no-memory', action='store_true', help='Skip peak memory measurement')
+    parser.add_argument('--save-baseline', default=None, help='Save results as baseline json file')
+    parser.add_argument('--compare', default=None, help='Compare results with baseline json file')
+    parser.add_argument('--tolerance', type=float, default=0.2)
+    arguments = parser.parse_args()
+
+    sizes = [size for size in benchmark_sizes if arguments.max_stops is None or size[0] <= arguments.max_stops]
+    results = benchmark(sizes=sizes, stages=arguments.stages, repeat=arguments.repeat,
+                        memory=not arguments.no_memory)
+
+    with pd.option_context('display.max_rows', None, 'display.max_columns', None, 'display.width', 200):
+        print(results)
+
+    if arguments.save_baseline:
+        save_baseline(results, arguments.save_baseline)
+
+    if arguments.compare:
+        regressions = compare_baseline(results, arguments.compare, arguments.tolerance)
+        if len(regressions):
+            print(regressions)
+            raise SystemExit(1)
+        print('No regressions')
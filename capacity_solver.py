@@ -0,0 +1,147 @@
+import argparse
+import contextlib
+import io
+
+import numpy as np
+import pandas as pd
+
+from simulation import Simulation
+
+
+class CapacitySolver:
+    '''
+    Reverse solver: minimum nominal battery capacity, with which a tour is completed without reaching the end of
+    discharge boundary (Battery.battery_charge_discharge_boundary)
+    Vehicle and battery management power do not depend on the battery, so the battery input power series (battery
+    management power) of one vectorized simulation is reused and only the battery kernel is recalculated for each capacity. Capacity is
+    bisected between an infeasible and a feasible capacity, as the discharge margin increases with capacity
+
+    Attributes
+    ----------
+    sim: Simulation. Electric vehicle simulation of tour
+    parameters: dict. Battery parameters overriding values of json file, except capacity_nominal_wh
+    tolerance: float [Wh]. Capacity tolerance of bisection
+    iterations: list of dicts. Capacity, margin and feasibility of each battery calculation
+
+    Methods
+    -------
+    get_margin
+    solve
+    '''
+
+    def __init__(self, sim, tolerance=100.):
+        '''
+        Parameters
+        ----------
+        sim: Simulation. Electric vehicle simulation of tour, simulated with simulate_vectorized if not yet simulated
+        tolerance: float [Wh]. Capacity tolerance of bisection
+        '''
+        if sim.components_skipped:
+            raise ValueError('Capacity solver needs an electric vehicle, ' + sim.vehicle.specification + ' has no battery')
+
+        if sim.needs_update:
+            sim.simulate_vectorized()
+
+        self.sim = sim
+        self.parameters = {name: value for name, value in sim.parameters.get('battery', {}).items()
+                           if name != 'capacity_nominal_wh'}
+        self.tolerance = tolerance
+        self.power = np.array(sim.get_input_power(sim.results, 'battery'))
+        self.iterations = list()
+
+
+    def get_margin(self, capacity):
+        '''
+        Method calculates battery with nominal capacity and returns discharge margin: minimum difference of state of
+        charge and end of discharge boundary of all discharge timesteps, <= 0 if boundary is reached
+
+        Parameters
+        ----------
+        capacity: float [Wh]. Nominal battery capacity
+
+        Returns
+        -------
+        float [1]: discharge margin, inf without discharge timesteps
+        '''
+        self.sim.set_battery_parameters(dict(self.parameters, capacity_nominal_wh=capacity))
+        battery = self.sim.battery.calculate_vectorized(self.power)
+
+        discharge = self.power < 0
+        margin = np.min(battery['state_of_charge'][discharge] - battery['charge_discharge_boundary'][discharge]) \
+                 if discharge.any() else np.inf
+        self.iterations.append({'capacity_nominal_wh': capacity,
+                                'margin': margin,
+                                'feasible': margin > 0})
+
+        return margin
+
+
+    def solve(self, capacity_min=None, capacity_max=None, max_iterations=100):
+        '''
+        Method bisects nominal capacity, simulation results are recalculated with the minimum capacity afterwards
+
+        Parameters
+        ----------
+        capacity_min: float [Wh]. Infeasible start capacity, None for half of largest infeasible power of two fraction
+            of capacity of json file
+        capacity_max: float [Wh]. Feasible start capacity, None for doubled capacity until feasible
+        max_iterations: int. Maximum number of battery calculations to find start capacities
+
+        Returns
+        -------
+        dict: capacity_nominal_wh [Wh] (minimum feasible capacity), margin [1] (discharge margin of this capacity),
+            margin_wh [Wh] (margin * capacity), state_of_charge_min [1], iterations
+        '''
+        self.iterations = list()
+        capacity = self.sim.battery.capacity_nominal_wh
+
+        ## Feasible upper and infeasible lower start capacity
+        if capacity_max is None:
+            capacity_max = capacity
+            while self.get_margin(capacity_max) <= 0:
+                capacity_max *= 2
+                if len(self.iterations) >= max_iterations:
+                    raise ValueError('No feasible battery capacity up to ' + str(capacity_max) + ' Wh')
+        elif self.get_margin(capacity_max) <= 0:
+            raise ValueError('Battery capacity_max ' + str(capacity_max) + ' Wh is not feasible')
+
+        if capacity_min is None:
+            capacity_min = min(capacity, capacity_max) / 2
+            while self.get_margin(capacity_min) > 0:
+                capacity_min /= 2
+                if len(self.iterations) >= max_iterations:
+                    raise ValueError('Battery capacity down to ' + str(capacity_min) + ' Wh is feasible')
+        elif self.get_margin(capacity_min) > 0:
+            raise ValueError('Battery capacity_min ' + str(capacity_min) + ' Wh is feasible, no minimum capacity')
+
+        ## Bisection
+        while capacity_max - capacity_min > self.tolerance:
+            capacity = 0.5 * (capacity_min + capacity_max)
+            if self.get_margin(capacity) > 0:
+                capacity_max = capacity
+            else:
+                capacity_min = capacity
+
+        # Simulation results of minimum feasible capacity with new battery
+        margin = [iteration['margin'] for iteration in self.iterations
+                  if iteration['capacity_nominal_wh'] == capacity_max][-1]
+        self.sim.set_battery_parameters(dict(self.parameters, capacity_nominal_wh=capacity_max))
+        self.sim.simulate_battery()
+
+        return {'capacity_nominal_wh': capacity_max,
+                'margin': margin,
+                'margin_wh': margin * capacity_max,
+                'state_of_charge_min': self.sim.kpi.state_of_charge_min,
+                'iterations': len(self.iterations)}
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Minimum battery capacity of a tour')
+    parser.add_argument('--tour', default='data/load/tour.pkl', help='Pickled route parameters')
+    parser.add_argument('--tolerance', type=float, default=100., help='Capacity tolerance [Wh]')
+    arguments = parser.parse_args()
+
+    with contextlib.redirect_stdout(io.StringIO()):
+        sim = Simulation(pd.read_pickle(arguments.tour))
+    for key, value in CapacitySolver(sim, tolerance=arguments.tolerance).solve().items():
+        print(key, value)
@@ -0,0 +1,182 @@
+import numpy as np
+import pandas as pd
+
+
+class CompactProfile:
+    '''
+    Compact route profile representation, e.g. for caches of many synthesized route profiles
+    Step columns (loader_active, container_mass, phase_type, charger_power) are run length encoded, kinematic
+    columns (speed, acceleration, distance) are run length encoded if smaller than dense (constant speed and
+    acceleration of work phase cycles), otherwise stored dense. Values are stored as float32 where lossless,
+    kinematic columns optionally always (float32=True)
+    Columns are expanded on access (profile.speed, profile['speed']), so the profile can be used by the vectorized,
+    streaming and adaptive simulation instead of the route profile DataFrame. Step simulation expands the profile once
+
+    Attributes
+    ----------
+    columns : list of str. Column names of route profile
+    length : int. Number of timesteps
+    runs : dict. {column: (start timesteps of runs, run values)}
+    dense : dict. {column: array}
+    dtypes : dict. {column: dtype of route profile column}
+
+    Methods
+    -------
+    get_column
+    get_runs
+    slice
+    to_dataframe
+    nbytes
+    '''
+
+    # Columns with long constant runs, run length encoded
+    step_columns = ['loader_active', 'container_mass', 'phase_type', 'charger_power']
+    # Columns changing every timestep while driving, run length encoded or dense
+    kinematic_columns = ['speed', 'acceleration', 'distance']
+
+    def __init__(self, profile, float32=False):
+        '''
+        Parameters
+        ----------
+        profile : DataFrame. Route profile (e.g. Route.profile_day)
+        float32 : bool. Store kinematic columns as float32 even if not lossless (relative error ~1e-7)
+        '''
+        self.columns = list(profile.columns)
+        self.length = len(profile)
+        self.runs = dict()
+        self.dense = dict()
+        self.dtypes = dict()
+        # Run start timesteps, int32 for route profiles below 2^31 timesteps
+        index_dtype = np.int32 if self.length < 2**31 else np.int64
+
+        for column in self.columns:
+            values = np.asarray(profile[column])
+            self.dtypes[column] = values.dtype
+
+            # float32 values if lossless or forced for kinematic columns
+            if values.dtype == np.float64:
+                values_float32 = values.astype(np.float32)
+                if (float32 and column in self.kinematic_columns) or np.array_equal(values_float32, values):
+                    values = values_float32
+
+            start = np.ones(self.length, dtype=bool)
+            start[1:] = values[1:] != values[:-1]
+            start = np.flatnonzero(start)
+
+            # Run length encoding if smaller than dense column
+            if column in self.step_columns or \
+               len(start) * (np.dtype(index_dtype).itemsize + values.itemsize) < values.nbytes:
+                self.runs[column] = (start.astype(index_dtype), values[start])
+            else:
+                self.dense[column] = values
+
+
+    def __len__(self):
+        return self.length
+
+
+    def __contains__(self, column):
+        return column in self.dtypes
+
+
+    def __getitem__(self, key):
+        '''
+        Column (str) or timestep slice (slice, returns CompactProfile)
+        '''
+        if isinstance(key, slice):
+            return self.slice(*key.indices(self.length)[:2])
+
+        return self.get_column(key)
+
+
+    def __getattr__(self, name):
+        # Columns as attributes like DataFrame, only called for names which are no instance attributes
+        if name in self.__dict__.get('dtypes', ()):
+            return self.get_column(name)
+        raise AttributeError("'CompactProfile' object has no attribute '" + name + "'")
+
+
+    def get_column(self, column):
+        '''
+        Method returns expanded column with dtype of route profile
+
+        Parameters
+        ----------
+        column : str. Column name
+        '''
+        if column in self.dense:
+            return self.dense[column].astype(self.dtypes[column], copy=False)
+
+        if column not in self.runs:
+            raise KeyError(column)
+
+        start, values = self.runs[column]
+        return np.repeat(values, np.diff(np.append(start, self.length))).astype(self.dtypes[column], copy=False)
+
+
+    def get_runs(self, column):
+        '''
+        Method returns runs of run length encoded column
+
+        Parameters
+        ----------
+        column : str. Column name
+
+        Returns
+        -------
+        array of int: start timestep of each run
+        array of int: duration [timesteps] of each run
+        array: value of each run
+        '''
+        start, values = self.runs[column]
+        return start, np.diff(np.append(start, self.length)), values
+
+
+    def slice(self, start, stop):
+        '''
+        Method returns timesteps start to stop (excl.) as CompactProfile, without expansion
+
+        Parameters
+        ----------
+        start : int. First timestep
+        stop : int. Timestep after last timestep
+        '''
+        stop = max(start, min(stop, self.length))
+        profile = object.__new__(CompactProfile)
+        profile.columns = list(self.columns)
+        profile.length = stop - start
+        profile.dtypes = dict(self.dtypes)
+        profile.dense = {column: values[start:stop] for column, values in self.dense.items()}
+        profile.runs = dict()
+        for column, (run_start, values) in self.runs.items():
+            # Runs overlapping timesteps, first run starts at first timestep
+            first = max(np.searchsorted(run_start, start, side='right') - 1, 0)
+            last = np.searchsorted(run_start, stop, side='left')
+            run_start = np.maximum(run_start[first:last], start) - start
+            profile.runs[column] = (run_start.astype(self.runs[column][0].dtype), values[first:last])
+
+        return profile
+
+
+    def to_dataframe(self):
+        '''
+        Method returns expanded route profile DataFrame
+
+        Parameters
+        ----------
+        None
+        '''
+        return pd.DataFrame({column: self.get_column(column) for column in self.columns})
+
+
+    @property
+    def nbytes(self):
+        '''
+        Memory of stored arrays [bytes]
+
+        Parameters
+        ----------
+        None
+        '''
+        return sum(values.nbytes for values in self.dense.values()) \
+               + sum(start.nbytes + values.nbytes for start, values in self.runs.values())
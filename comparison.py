@@ -0,0 +1,99 @@
+import argparse
+
+import pandas as pd
+
+from simulation import Simulation
+from evaluation import get_results_parameter
+
+
+class Comparison:
+    '''
+    Comparison of several vehicle specifications on one tour
+    Route profile is synthesized once and shared by the simulations of all vehicle specifications
+
+    Attributes
+    ----------
+    data_route: dict. Route parameters (see Simulation)
+    vehicle_files: list of json files. Vehicle parameter files, e.g. electric and diesel vehicle
+    labels: list of str. Label of each vehicle file, None for vehicle specifications
+    vectorized: bool. Use Simulation.simulate_vectorized instead of step simulation
+    simulations: dict. {label: Simulation} of simulated vehicles
+
+    Methods
+    -------
+    simulate
+    '''
+
+    def __init__(self, data_route, vehicle_files=('data/components/vehicle_electric.json',
+                                                  'data/components/vehicle_diesel.json'),
+                 labels=None, vectorized=True):
+        '''
+        Parameters
+        ----------
+        data_route: dict. Route parameters (see Simulation)
+        vehicle_files: list of json files. Vehicle parameter files
+        labels: list of str. Label of each vehicle file (e.g. for several files of one vehicle specification),
+            None for vehicle specifications
+        vectorized: bool. Use vectorized simulation
+        '''
+        if labels is not None and len(labels) != len(vehicle_files):
+            raise ValueError('Number of labels ' + str(len(labels)) + ' differs from number of vehicle files '
+                             + str(len(vehicle_files)))
+
+        self.data_route = data_route
+        self.vehicle_files = list(vehicle_files)
+        self.labels = list(labels) if labels is not None else None
+        self.vectorized = vectorized
+        self.simulations = dict()
+
+
+    def simulate(self):
+        '''
+        Method simulates all vehicle specifications on the shared route profile
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: evaluation parameters, one column per label (vehicle specification)
+        '''
+        route = None
+        results = dict()
+        self.simulations = dict()
+        for i, vehicle_file in enumerate(self.vehicle_files):
+            # Route of first simulation is reused
+            sim = Simulation(self.data_route, vehicle_file=vehicle_file, route=route)
+            route = sim.route
+
+            label = self.labels[i] if self.labels is not None else sim.vehicle.specification
+            if label in results:
+                raise ValueError('Duplicate comparison label ' + label + ' of vehicle file ' + vehicle_file
+                                 + ', use labels to distinguish vehicle files')
+
+            if self.vectorized:
+                sim.simulate_vectorized()
+            else:
+                sim.simulate()
+
+            self.simulations[label] = sim
+            results[label] = get_results_parameter(sim)
+
+        # Parameters of all vehicles in one table, parameters not evaluated for a specification are NaN
+        return pd.DataFrame(results)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Comparison of vehicle specifications on one tour')
+    parser.add_argument('--tour', default='data/load/tour.pkl', help='Pickled route parameters')
+    parser.add_argument('--vehicles', nargs='+', default=['data/components/vehicle_electric.json',
+                                                         'data/components/vehicle_diesel.json'])
+    parser.add_argument('--labels', nargs='+', default=None, help='Label of each vehicle file')
+    parser.add_argument('--step', action='store_true', help='Use step simulation instead of vectorized simulation')
+    arguments = parser.parse_args()
+
+    comparison = Comparison(pd.read_pickle(arguments.tour), vehicle_files=arguments.vehicles,
+                            labels=arguments.labels, vectorized=not arguments.step)
+    with pd.option_context('display.max_rows', None, 'display.width', 200):
+        print(comparison.simulate())
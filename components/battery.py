@@ -2,6 +2,228 @@ import numpy as np
 from components.simulatable import Simulatable
 from components.serializable import Serializable
 
+# Optional just in time compilation of battery kernel
+try:
+    from numba import njit
+except ImportError:
+    njit = None
+
+
+def battery_kernel(power, state_of_charge, temperature, power_loss,
+                   capacity_nominal_wh, capacity_current_wh, timestep, power_self_discharge_rate,
+                   charge_power_efficiency_a, charge_power_efficiency_b,
+                   discharge_power_efficiency_a, discharge_power_efficiency_b,
+                   end_of_discharge_a, end_of_discharge_b, end_of_charge_a, end_of_charge_b,
+                   heat_transfer_coefficient, surface, heat_capacity, mass, temperature_ambient,
+                   power_battery_out, efficiency_out, power_loss_out, state_of_charge_out,
+                   temperature_out, charge_discharge_boundary_out):
+    '''
+    Battery kernel: Sequential battery model over a whole input power series
+    Integrates thermal model, battery power, state of charge and charge/discharge boundary
+    in the same order and with the same formulas as Battery.calculate
+
+    Parameters
+    ----------
+    power: array. Input power series [W]
+    state_of_charge, temperature, power_loss: float. Battery state before first timestep
+    capacity_nominal_wh ... temperature_ambient: float. Battery parameters
+    *_out: array. Preallocated output arrays, filled by kernel
+
+    Returns
+    -------
+    tuple: state_of_charge, temperature, power_loss after last timestep
+    '''
+    for t in range(len(power)):
+        ## Thermal model
+        temperature = temperature + ((abs(power_loss) - heat_transfer_coefficient * surface * \
+                      (temperature - temperature_ambient)) / (heat_capacity * mass / timestep))
+
+        ## Battery power
+        power_input = power[t]
+        if power_input > 0.:
+            efficiency = charge_power_efficiency_a * (power_input/capacity_nominal_wh) + charge_power_efficiency_b
+            power_battery = power_input * efficiency
+        elif power_input < 0.:
+            efficiency = discharge_power_efficiency_a * (abs(power_input)/capacity_nominal_wh) + discharge_power_efficiency_b
+            power_battery = power_input / efficiency
+        else:
+            efficiency = 0.
+            power_battery = power_input * efficiency
+        power_loss = power_input - power_battery
+        power_battery_calc = power_battery
+
+        ## State of charge
+        state_of_charge_old = state_of_charge
+        state_of_charge = state_of_charge + (power_battery_calc / capacity_current_wh * (timestep/3600)) \
+                          - (power_self_discharge_rate * timestep)
+
+        ## Charge/discharge boundary
+        if power_input < 0.:
+            charge_discharge_boundary = end_of_discharge_a * (abs(power_battery)/capacity_nominal_wh) + end_of_discharge_b
+        else:
+            charge_discharge_boundary = end_of_charge_a * (power_battery/capacity_nominal_wh) + end_of_charge_b
+
+        ## Boundary check
+        # Discharge case, calculated SoC is under boundary - EMPTY
+        if power_input < 0:
+            if state_of_charge < charge_discharge_boundary:
+                power_battery = np.round(power_battery_calc + ((abs(state_of_charge - charge_discharge_boundary)
+                                - power_self_discharge_rate) * capacity_current_wh / (timestep/3600)), 4)
+                if power_battery > 0:
+                    power_battery = 0.
+                    state_of_charge = state_of_charge_old
+                else:
+                    state_of_charge = charge_discharge_boundary
+        # Charge case, calculated SoC is above boundary - FULL
+        elif power_input > 0:
+            if state_of_charge > charge_discharge_boundary:
+                power_battery = np.round(power_battery_calc - ((abs(state_of_charge - charge_discharge_boundary)
+                                + power_self_discharge_rate) * capacity_current_wh / (timestep/3600)), 4)
+                if power_battery < 0:
+                    power_battery = 0.
+                    state_of_charge = state_of_charge_old
+                else:
+                    state_of_charge = charge_discharge_boundary
+
+        power_battery_out[t] = power_battery
+        efficiency_out[t] = efficiency
+        power_loss_out[t] = power_loss
+        state_of_charge_out[t] = state_of_charge
+        temperature_out[t] = temperature
+        charge_discharge_boundary_out[t] = charge_discharge_boundary
+
+    return state_of_charge, temperature, power_loss
+
+
+def battery_segment_kernel(power, duration, state_of_charge, temperature, power_loss,
+                           capacity_nominal_wh, capacity_current_wh, timestep, power_self_discharge_rate,
+                           charge_power_efficiency_a, charge_power_efficiency_b,
+                           discharge_power_efficiency_a, discharge_power_efficiency_b,
+                           end_of_discharge_a, end_of_discharge_b, end_of_charge_a, end_of_charge_b,
+                           heat_transfer_coefficient, surface, heat_capacity, mass, temperature_ambient,
+                           power_battery_out, efficiency_out, power_loss_out, state_of_charge_out,
+                           temperature_out, charge_discharge_boundary_out):
+    '''
+    Battery segment kernel: Battery model over segments of constant input power
+    Each segment is advanced in closed form: state of charge linear, temperature geometric towards steady state
+    temperature. Segments which reach the charge/discharge boundary are calculated step by step like battery_kernel
+
+    Parameters
+    ----------
+    power: array. Input power of segments [W]
+    duration: array of int. Number of timesteps of segments
+    state_of_charge, temperature, power_loss: float. Battery state before first segment
+    capacity_nominal_wh ... temperature_ambient: float. Battery parameters
+    *_out: array. Preallocated output arrays, filled by kernel: mean battery power of segment,
+        all other values of last timestep of segment
+
+    Returns
+    -------
+    tuple: state_of_charge, temperature, power_loss after last segment
+    '''
+    # Thermal model: T(k+1) - T_steady = (1 - decay) * (T(k) - T_steady)
+    decay = heat_transfer_coefficient * surface * timestep / (heat_capacity * mass)
+
+    for s in range(len(power)):
+        steps = duration[s]
+
+        ## Thermal model, first timestep with power loss of previous timestep
+        temperature = temperature + ((abs(power_loss) - heat_transfer_coefficient * surface * \
+                      (temperature - temperature_ambient)) / (heat_capacity * mass / timestep))
+
+        ## Battery power, constant for segment
+        power_input = power[s]
+        if power_input > 0.:
+            efficiency = charge_power_efficiency_a * (power_input/capacity_nominal_wh) + charge_power_efficiency_b
+            power_battery = power_input * efficiency
+        elif power_input < 0.:
+            efficiency = discharge_power_efficiency_a * (abs(power_input)/capacity_nominal_wh) + discharge_power_efficiency_b
+            power_battery = power_input / efficiency
+        else:
+            efficiency = 0.
+            power_battery = power_input * efficiency
+        power_loss = power_input - power_battery
+        power_battery_calc = power_battery
+
+        ## Charge/discharge boundary, constant for segment
+        if power_input < 0.:
+            charge_discharge_boundary = end_of_discharge_a * (abs(power_battery)/capacity_nominal_wh) + end_of_discharge_b
+        else:
+            charge_discharge_boundary = end_of_charge_a * (power_battery/capacity_nominal_wh) + end_of_charge_b
+
+        ## State of charge is linear in segment, boundary is reached at first or last timestep if at all
+        state_of_charge_step = state_of_charge + (power_battery_calc / capacity_current_wh * (timestep/3600)) \
+                               - (power_self_discharge_rate * timestep)
+        state_of_charge_end = state_of_charge + steps * (power_battery_calc / capacity_current_wh * (timestep/3600)) \
+                              - steps * (power_self_discharge_rate * timestep)
+        if power_input < 0.:
+            boundary = min(state_of_charge_step, state_of_charge_end) < charge_discharge_boundary
+        elif power_input > 0.:
+            boundary = max(state_of_charge_step, state_of_charge_end) > charge_discharge_boundary
+        else:
+            boundary = False
+
+        if not boundary:
+            ## Closed form
+            state_of_charge = state_of_charge_end
+            if decay > 0:
+                temperature_steady = temperature_ambient + abs(power_loss) / (heat_transfer_coefficient * surface)
+                temperature = temperature_steady + (1 - decay)**(steps - 1) * (temperature - temperature_steady)
+            else:
+                temperature = temperature + (steps - 1) * abs(power_loss) / (heat_capacity * mass / timestep)
+            power_battery_mean = power_battery
+
+        else:
+            ## Step by step with boundary check of battery_kernel
+            power_battery_sum = 0.
+            for k in range(steps):
+                if k > 0:
+                    temperature = temperature + ((abs(power_loss) - heat_transfer_coefficient * surface * \
+                                  (temperature - temperature_ambient)) / (heat_capacity * mass / timestep))
+                state_of_charge_old = state_of_charge
+                state_of_charge = state_of_charge + (power_battery_calc / capacity_current_wh * (timestep/3600)) \
+                                  - (power_self_discharge_rate * timestep)
+                power_battery = power_battery_calc
+                if power_input < 0:
+                    if state_of_charge < charge_discharge_boundary:
+                        power_battery = np.round(power_battery_calc + ((abs(state_of_charge - charge_discharge_boundary)
+                                        - power_self_discharge_rate) * capacity_current_wh / (timestep/3600)), 4)
+                        if power_battery > 0:
+                            power_battery = 0.
+                            state_of_charge = state_of_charge_old
+                        else:
+                            state_of_charge = charge_discharge_boundary
+                elif power_input > 0:
+                    if state_of_charge > charge_discharge_boundary:
+                        power_battery = np.round(power_battery_calc - ((abs(state_of_charge - charge_discharge_boundary)
+                                        + power_self_discharge_rate) * capacity_current_wh / (timestep/3600)), 4)
+                        if power_battery < 0:
+                            power_battery = 0.
+                            state_of_charge = state_of_charge_old
+                        else:
+                            state_of_charge = charge_discharge_boundary
+                power_battery_sum += power_battery
+            power_battery_mean = power_battery_sum / steps
+
+        power_battery_out[s] = power_battery_mean
+        efficiency_out[s] = efficiency
+        power_loss_out[s] = power_loss
+        state_of_charge_out[s] = state_of_charge
+        temperature_out[s] = temperature
+        charge_discharge_boundary_out[s] = charge_discharge_boundary
+
+    return state_of_charge, temperature, power_loss
+
+
+# Compiled kernels if numba is installed, otherwise pure python/numpy kernels
+if njit is not None:
+    battery_kernel_compiled = njit(cache=True)(battery_kernel)
+    battery_segment_kernel_compiled = njit(cache=True)(battery_segment_kernel)
+else:
+    battery_kernel_compiled = battery_kernel
+    battery_segment_kernel_compiled = battery_segment_kernel
+
+
 class Battery(Serializable, Simulatable):
     '''
     Provides all relevant methods for the calculation of battery performance
@@ -16,7 +238,12 @@ class Battery(Serializable, Simulatable):
     Methods
     -------
     start
+    reset_state
     calculate
+    calculate_vectorized
+    calculate_segments
+    get_power_battery
+    count_branches
     battery_temperature
     battery_power
     battery_state_of_charge
@@ -26,18 +253,19 @@ class Battery(Serializable, Simulatable):
     battery_state_of_destruction
     '''
 
-    def __init__(self, timestep, input_link, file_path = None):
+    def __init__(self, timestep, input_link, file_path = None, parameters = None):
         '''
         Parameters
         ----------
         timestep: int. Simulation timestep in seconds
         input_link: class. Class of component which supplies input power
         file_path : json file to load battery parameters
+        parameters : dict. Component parameters overriding values of json file
         '''
 
         # Read component parameters from json file
         if file_path:
-            self.load(file_path)
+            self.load(file_path, parameters)
 
         else:
             print('Attention: No json file for battery model specified')
@@ -54,15 +282,26 @@ class Battery(Serializable, Simulatable):
         ##Power model
         # [Wh] Current battery nominal capacity at nominal C-Rate
         self.capacity_current_wh = self.capacity_nominal_wh
-        # Initialize initial paremeters
-        self.state_of_charge = 0.9
 
         ## Temperature model
         # [kg] Mass of the battery
         self.mass =  self.capacity_nominal_wh / self.energy_density_kg
         # [m^2] Battery area
         self.surface = self.capacity_nominal_wh / self.energy_density_m2
+
         # Initialize initial parameters
+        self.reset_state()
+
+
+    def reset_state(self):
+        '''
+        Method resets battery state to initial state: state of charge, temperature and power loss
+
+        Parameters
+        ----------
+        None
+        '''
+        self.state_of_charge = 0.9
         self.temperature = 298.15
         self.power_loss = 0.
 
@@ -123,6 +362,135 @@ class Battery(Serializable, Simulatable):
                     self.state_of_charge = self.charge_discharge_boundary
 
 
+    def calculate_vectorized(self, power):
+        '''
+        Vectorized calculation: Method calculates all battery performance parameters for a whole input power series
+        Sequential battery model is evaluated with battery_kernel (compiled if numba is installed)
+        Battery state (state_of_charge, temperature, power_loss) is taken as initial state and updated afterwards
+
+        Parameters
+        ----------
+        power: array. Input power series [W] e.g. battery management power
+
+        Returns
+        -------
+        dict of numpy arrays: power_battery, efficiency, power_loss, state_of_charge,
+            temperature, charge_discharge_boundary
+        '''
+        power = np.ascontiguousarray(power, dtype=float)
+        results = {key: np.empty(len(power)) for key in ['power_battery', 'efficiency', 'power_loss',
+                                                          'state_of_charge', 'temperature',
+                                                          'charge_discharge_boundary']}
+        # Static ambient temperature [K]
+        self.temperature_ambient = 298.15
+
+        # Pure python kernel is faster with python floats than with numpy scalars
+        power_kernel = power if battery_kernel_compiled is not battery_kernel else power.tolist()
+
+        self.state_of_charge, self.temperature, self.power_loss = battery_kernel_compiled(
+            power_kernel, float(self.state_of_charge), float(self.temperature), float(self.power_loss),
+            self.capacity_nominal_wh, self.capacity_current_wh, float(self.timestep), self.power_self_discharge_rate,
+            self.charge_power_efficiency_a, self.charge_power_efficiency_b,
+            self.discharge_power_efficiency_a, self.discharge_power_efficiency_b,
+            self.end_of_discharge_a, self.end_of_discharge_b, self.end_of_charge_a, self.end_of_charge_b,
+            self.heat_transfer_coefficient, self.surface, self.heat_capacity, self.mass, self.temperature_ambient,
+            results['power_battery'], results['efficiency'], results['power_loss'],
+            results['state_of_charge'], results['temperature'], results['charge_discharge_boundary'])
+
+        # Keep last timestep values like step calculation
+        if len(power):
+            self.power_battery = results['power_battery'][-1]
+            self.efficiency = results['efficiency'][-1]
+            self.charge_discharge_boundary = results['charge_discharge_boundary'][-1]
+
+        return results
+
+
+    def calculate_segments(self, power, duration):
+        '''
+        Segment calculation: Method calculates battery performance parameters for segments of constant input power
+        (see battery_segment_kernel), e.g. of a run length encoded route profile
+        Battery state (state_of_charge, temperature, power_loss) is taken as initial state and updated afterwards
+
+        Parameters
+        ----------
+        power: array. Input power of segments [W]
+        duration: array of int. Number of timesteps of segments
+
+        Returns
+        -------
+        dict of numpy arrays: power_battery (mean of segment), efficiency, power_loss, state_of_charge,
+            temperature, charge_discharge_boundary (last timestep of segment)
+        '''
+        power = np.ascontiguousarray(power, dtype=float)
+        duration = np.ascontiguousarray(duration, dtype=np.int64)
+        results = {key: np.empty(len(power)) for key in ['power_battery', 'efficiency', 'power_loss',
+                                                          'state_of_charge', 'temperature',
+                                                          'charge_discharge_boundary']}
+        # Static ambient temperature [K]
+        self.temperature_ambient = 298.15
+
+        # Pure python kernel is faster with python floats than with numpy scalars
+        if battery_segment_kernel_compiled is battery_segment_kernel:
+            power, duration = power.tolist(), duration.tolist()
+
+        self.state_of_charge, self.temperature, self.power_loss = battery_segment_kernel_compiled(
+            power, duration, float(self.state_of_charge), float(self.temperature), float(self.power_loss),
+            self.capacity_nominal_wh, self.capacity_current_wh, float(self.timestep), self.power_self_discharge_rate,
+            self.charge_power_efficiency_a, self.charge_power_efficiency_b,
+            self.discharge_power_efficiency_a, self.discharge_power_efficiency_b,
+            self.end_of_discharge_a, self.end_of_discharge_b, self.end_of_charge_a, self.end_of_charge_b,
+            self.heat_transfer_coefficient, self.surface, self.heat_capacity, self.mass, self.temperature_ambient,
+            results['power_battery'], results['efficiency'], results['power_loss'],
+            results['state_of_charge'], results['temperature'], results['charge_discharge_boundary'])
+
+        # Keep last segment values like step calculation
+        if len(power):
+            self.power_battery = results['power_battery'][-1]
+            self.efficiency = results['efficiency'][-1]
+            self.charge_discharge_boundary = results['charge_discharge_boundary'][-1]
+
+        return results
+
+
+    def get_power_battery(self, power):
+        '''
+        Method returns battery power (without charge/discharge boundary) for input power series [W],
+        stationary power model of battery_power
+
+        Parameters
+        ----------
+        power: array. Input power series [W]
+        '''
+        power = np.asarray(power, dtype=float)
+        efficiency = np.select([power > 0, power < 0],
+                               [self.charge_power_efficiency_a * (power/self.capacity_nominal_wh) + self.charge_power_efficiency_b,
+                                self.discharge_power_efficiency_a * (np.abs(power)/self.capacity_nominal_wh) + self.discharge_power_efficiency_b],
+                               default=1.)
+
+        return np.where(power > 0, power * efficiency, np.where(power < 0, power / efficiency, 0.))
+
+
+    def count_branches(self, counters):
+        '''
+        Profiling: Method counts branch outcomes of current timestep (see Simulatable.enable_profiling)
+            soc_boundary_clipped: state of charge set to charge/discharge boundary
+            soc_boundary_hold: boundary already reached, no battery power and state of charge kept
+
+        Parameters
+        ----------
+        counters : dict. Branch counters {branch: count}
+        '''
+        if self.input_link.power != 0 and self.state_of_charge == self.charge_discharge_boundary:
+            branch = 'soc_boundary_clipped'
+        elif self.input_link.power != 0 and self.power_battery == 0:
+            branch = 'soc_boundary_hold'
+        else:
+            return
+
+        counters[branch] = counters.get(branch, 0) + 1
+
+
     def battery_temperature(self):
         '''
         Battery Thermal Model: Method calculates the battery temperature in Kelvin [K]
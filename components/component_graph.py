@@ -0,0 +1,233 @@
+from collections import OrderedDict
+from graphlib import TopologicalSorter, CycleError
+
+
+class Power_Bus:
+    '''
+    Power bus, which sums output power of several components
+    Used as input link of components with more than one input (e.g. battery management supplying
+    drivetrain and auxiliary loads)
+
+    Attributes
+    ----------
+    input_links : list of class. Components which supply power
+
+    Methods
+    -------
+    power
+    '''
+
+    def __init__(self, *input_links):
+        '''
+        Parameters
+        ----------
+        *input_links : class. Components which supply power
+        '''
+        self.input_links = list(input_links)
+
+
+    @property
+    def power(self):
+        '''
+        Sum of power of all input links at current timestep
+
+        Parameters
+        ----------
+        None
+        '''
+        return sum(input_link.power for input_link in self.input_links)
+
+
+class ComponentGraph:
+    '''
+    Component graph of a vehicle energy system
+    Components are added with the names of the components which supply their input power. The graph is ordered
+    topologically once, input links are set accordingly and the order is used for step and vectorized simulation:
+        components without inputs (sources) are calculated with the route profile
+        components with one input get the output power of this input
+        components with several inputs get the summed output power of all inputs (Power_Bus)
+
+    Attributes
+    ----------
+    components : OrderedDict. {name: component}
+    inputs : dict. {name: list of input component names}
+
+    Methods
+    -------
+    add
+    set_inputs
+    replace
+    get_order
+    get_dependents
+    get_components
+    link
+    calculate_vectorized
+    '''
+
+    def __init__(self):
+        '''
+        Parameters
+        ----------
+        None
+        '''
+        self.components = OrderedDict()
+        self.inputs = dict()
+        # Topological order, computed on first use
+        self.order = None
+
+
+    def add(self, name, component, inputs=(), outputs=()):
+        '''
+        Method adds component to graph
+
+        Parameters
+        ----------
+        name : str. Component name, e.g. battery_management
+        component : class. Simulatable component with calculate and calculate_vectorized methods
+        inputs : list of str. Names of components which supply input power, empty for source components
+        outputs : list of str. Names of components which are supplied by the component: inputs of these components,
+            which are also inputs of the component, are replaced by the component (component is inserted in between),
+            otherwise the component is added as further input (e.g. auxiliary load at battery management input)
+        '''
+        if name in self.components:
+            raise ValueError('Component ' + name + ' already in component graph, use replace instead')
+
+        self.components[name] = component
+        self.inputs[name] = list(inputs)
+        self.order = None
+
+        for output in outputs:
+            if output not in self.components:
+                raise ValueError('Unknown output ' + output + ' of component ' + name + ' in component graph')
+            inputs_output = [input_name for input_name in self.inputs[output] if input_name not in inputs]
+            self.set_inputs(output, inputs_output + [name])
+
+
+    def set_inputs(self, name, inputs):
+        '''
+        Method sets names of components which supply input power of a component, links are renewed on next use
+
+        Parameters
+        ----------
+        name : str. Component name
+        inputs : list of str. Names of components which supply input power, empty for source components
+        '''
+        if name not in self.components:
+            raise ValueError('Unknown component ' + name + ' in component graph')
+
+        self.inputs[name] = list(inputs)
+        self.order = None
+
+
+    def replace(self, name, component):
+        '''
+        Method replaces component of graph, inputs are kept and links are renewed
+
+        Parameters
+        ----------
+        name : str. Component name
+        component : class. New component
+        '''
+        if name not in self.components:
+            raise ValueError('Unknown component ' + name + ' in component graph')
+
+        self.components[name] = component
+        self.link()
+
+
+    def get_order(self):
+        '''
+        Method returns component names in topological order (inputs before consuming components)
+
+        Parameters
+        ----------
+        None
+        '''
+        if self.order is None:
+            for name, inputs in self.inputs.items():
+                for input_name in inputs:
+                    if input_name not in self.components:
+                        raise ValueError('Unknown input ' + input_name + ' of component ' + name + ' in component graph')
+            try:
+                self.order = list(TopologicalSorter(self.inputs).static_order())
+            except CycleError as error:
+                raise ValueError('Component graph contains a cycle: ' + str(error.args[1]))
+            self.link()
+
+        return self.order
+
+
+    def get_dependents(self, names):
+        '''
+        Method returns names of components and of all components depending on them (directly or via other
+        components) in topological order
+
+        Parameters
+        ----------
+        names : list of str. Component names
+        '''
+        dependents = set(names)
+        for name in self.get_order():
+            if any(input_name in dependents for input_name in self.inputs[name]):
+                dependents.add(name)
+
+        return [name for name in self.get_order() if name in dependents]
+
+
+    def get_components(self, exclude=()):
+        '''
+        Method returns components in topological order
+
+        Parameters
+        ----------
+        exclude : list of str. Names of components which are not returned (incl. all components depending on them)
+        '''
+        exclude = self.get_dependents(exclude)
+        return [self.components[name] for name in self.get_order() if name not in exclude]
+
+
+    def link(self):
+        '''
+        Method sets input links of all components with inputs according to graph
+
+        Parameters
+        ----------
+        None
+        '''
+        for name, inputs in self.inputs.items():
+            if len(inputs) == 1:
+                self.components[name].input_link = self.components[inputs[0]]
+            elif len(inputs) > 1:
+                self.components[name].input_link = Power_Bus(*[self.components[input_name] for input_name in inputs])
+
+
+    def calculate_vectorized(self, profile, exclude=()):
+        '''
+        Method calculates all components with vectorized models in topological order
+        Stateless components are evaluated for all timesteps at once, stateful components (battery)
+        with their sequential kernel
+
+        Parameters
+        ----------
+        profile : DataFrame. Route profile (input of source components)
+        exclude : list of str. Names of components which are not calculated (incl. all components depending on them)
+
+        Returns
+        -------
+        dict: {name: results of calculate_vectorized of component}
+        '''
+        exclude = self.get_dependents(exclude)
+        results = dict()
+        for name in self.get_order():
+            if name in exclude:
+                continue
+            inputs = self.inputs[name]
+            if not inputs:
+                results[name] = self.components[name].calculate_vectorized(profile)
+            elif len(inputs) == 1:
+                results[name] = self.components[name].calculate_vectorized(results[inputs[0]]['power'])
+            else:
+                results[name] = self.components[name].calculate_vectorized(
+                                    sum(results[input_name]['power'] for input_name in inputs))
+
+        return results
@@ -1,3 +1,5 @@
+import numpy as np
+
 from components.simulatable import Simulatable
 from components.serializable import Serializable
 
@@ -16,21 +18,24 @@ class Power_Component(Serializable, Simulatable):
     Methods
     -------
     calculate
+    calculate_vectorized
+    count_branches
     __calculate_power_output
     __calculate_power_input
     '''
 
-    def __init__(self, timestep, input_link, file_path = None):
+    def __init__(self, timestep, input_link, file_path = None, parameters = None):
         '''
         Parameters
         ----------
         timestep: int. Simulation timestep in seconds
         input_link : class. Class of component which supplies input power
         file_path : json file to load power component parameters
+        parameters : dict. Component parameters overriding values of json file
         '''
         # Read component parameters from json file
         if file_path:
-            self.load(file_path)
+            self.load(file_path, parameters)
 
         else:
             print('Attention: No json file for power component efficiency specified')
@@ -68,6 +73,66 @@ class Power_Component(Serializable, Simulatable):
             self.__calculate_power_input()
 
 
+    def calculate_vectorized(self, power):
+        '''
+        Vectorized calculation: Method calculates efficiency and power of power component for a whole input power series
+        Same case decisions as calculate: P_out(P_in) for positive/zero and P_in(P_out) for negative input power
+
+        Parameters
+        ----------
+        power: array. Input power series [W] e.g. vehicle power
+
+        Returns
+        -------
+        dict of numpy arrays: power, efficiency
+        '''
+        power = np.asarray(power, dtype=float)
+        output_case = (power > 0)
+        input_case = (power < 0)
+
+        ## Power output model for positive input power
+        # Dummy value for not calculated entries to avoid division by zero
+        power_input = np.minimum(1, np.where(output_case, power, self.power_nominal) / self.power_nominal)
+        efficiency_output = -((1 + self.voltage_loss_star) / (2 * self.resistance_loss_star * power_input)) \
+                + (((1 + self.voltage_loss_star)**2 / (2 * self.resistance_loss_star * power_input)**2) \
+                + ((power_input - self.power_self_consumption_star) / (self.resistance_loss_star * power_input**2)))**0.5
+        power_norm_output = power_input * efficiency_output
+        # In case of negative efficiency it is set to zero, no negative power flow as output possible
+        efficiency_output = np.maximum(efficiency_output, 0)
+        power_norm_output = np.maximum(power_norm_output, 0)
+
+        ## Power input model for negative input power
+        power_output = (np.abs(np.where(input_case, power, self.power_nominal)) / self.power_nominal)
+        efficiency_input = power_output / (power_output + self.power_self_consumption + (power_output * self.voltage_loss) \
+                + (power_output**2 * self.resistance_loss))
+        power_norm_input = power_output / efficiency_input
+
+        ## Combine cases, zero input power leads to zero power and efficiency
+        efficiency = np.select([output_case, input_case], [efficiency_output, efficiency_input], default=0.)
+        power_output_component = np.select([output_case, input_case],
+                                           [power_norm_output * self.power_nominal,
+                                            - (power_norm_input * self.power_nominal)],
+                                           default=0.)
+
+        return {'power': power_output_component,
+                'efficiency': efficiency}
+
+
+    def count_branches(self, counters):
+        '''
+        Profiling: Method counts branch outcomes of current timestep (see Simulatable.enable_profiling)
+            efficiency_zero_idle: zero input power
+            efficiency_zero_clipped: negative efficiency of power output model set to zero
+
+        Parameters
+        ----------
+        counters : dict. Branch counters {branch: count}
+        '''
+        if self.efficiency == 0:
+            branch = 'efficiency_zero_idle' if self.input_link.power == 0 else 'efficiency_zero_clipped'
+            counters[branch] = counters.get(branch, 0) + 1
+
+
     def __calculate_power_output (self):
         '''
         Power Component Power output model:
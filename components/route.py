@@ -1,9 +1,9 @@
 import pandas as pd
 import numpy as np
-from numpy.matlib import repmat
 import math
 
 from components.serializable import Serializable
+from compact_profile import CompactProfile
 import data_loader
 
 class Route(Serializable):
@@ -20,22 +20,30 @@ class Route(Serializable):
     get_profile
     drivephase
     workphase
+    workphase_cycle
+    chargephase
+    add_chargephase
+    get_segments
     '''
 
-    def __init__(self, timestep, data_route, file_path = None):
+    def __init__(self, timestep, data_route, file_path = None, parameters = None):
         '''
         Parameters:
             timestep: int [s]. simulation timestep
             data_route: dict. route data paraneters
             file_path: json file. Battery parameter load file
+            parameters: dict. Route parameters overriding values of json file
         '''
         # Read component parameters from json file
         if file_path:
-            self.load(file_path)
+            self.load(file_path, parameters)
 
         else:
             print('Attention: No json file for route model specified')
 
+        # Route parameters of json file (incl. overriding parameters), e.g. to identify synthesized profiles
+        self.route_parameters = dict(self.__dict__)
+
         # Define durations as integer
         self.t_wait = int(self.t_wait)
 
@@ -57,6 +65,7 @@ class Route(Serializable):
             drivephase_there - 07:00 to XX:XX
             workphase - XX:XX to XX:XX
             drivephase_back - XX:XX to XX:XX
+            chargephase - XX:XX to XX:XX, optional if data_route contains charge_duration [s] > 0
 
         Parameters
         ----------
@@ -66,11 +75,16 @@ class Route(Serializable):
         self.df_drivephase_there = self.drivephase(self.data_route['distance_there'])
         self.df_workphase = self.workphase()
         self.df_drivephase_back = self.drivephase(self.data_route['distance_back'])
+        phases = [self.df_drivephase_there,
+                  self.df_workphase,
+                  self.df_drivephase_back]
+
+        # Depot charge phase after return to recycling hub/depot
+        if self.data_route.get('charge_duration', 0) > 0:
+            self.df_chargephase = self.chargephase(int(self.data_route['charge_duration']))
+            phases.append(self.df_chargephase)
 
-        df_main = pd.concat([self.df_drivephase_there,
-                             self.df_workphase,
-                             self.df_drivephase_back],
-                            ignore_index=True)
+        df_main = pd.concat(phases, ignore_index=True)
 
         self.profile_day = df_main
 
@@ -109,89 +123,24 @@ class Route(Serializable):
 
 
         ## Working cycle synthetization
-        # [s] duration of a single working cycle
-        duration_cycle = self.t_a + self.t_v_max + self.t_b + self.t_loader + self.t_wait
-
-        route_speed = list()
-        route_acceleration = list()
-        route_loader_active = list()
-        route_distance = list()
-        route_container_mass = list()
-        route_type = list()
-
-        for j in range(0,(self.data_route['stops_sum']-1)):
-            #initial values
-            self.a_cycle = np.zeros(duration_cycle)
-            self.v_cycle = np.zeros(duration_cycle)
-            self.s_cycle = np.zeros(duration_cycle)
-            self.loader_active_cycle = np.zeros(duration_cycle)
-            self.container_mass = np.zeros(duration_cycle)
-
-            # Wait phase
-            for i in range(0, self.t_wait):
-                self.a_cycle[i] = 0
-                self.v_cycle[i] = 0
-                self.s_cycle[i] = 0
-                self.loader_active_cycle[i] = 0
-                self.container_mass[i] = 0
-
-            # loader phase
-            for i in range((self.t_wait), (self.t_wait+self.t_loader+1)):
-                self.a_cycle[i] = 0
-                self.v_cycle[i] = 0
-                self.s_cycle[i] = 0
-                self.loader_active_cycle[i] = 1
-                self.container_mass[i] = self.collection_mass_container_per_stop / (self.t_loader)
-
-            # Acceleration phase
-            while self.s_cycle[i-1] < (self.collection_distance_per_stop/2) and self.v_cycle[i-1] < self.speed_max:
-                self.v_cycle[i] = min((self.v_cycle[i-1] + self.acceleration_const*self.timestep), self.speed_max)    # [m/s] speed with threshold of speed_max
-                self.a_cycle[i] = self.v_cycle[i] - self.v_cycle[i-1]
-                self.s_cycle[i] = 0.5*self.a_cycle[i]*self.timestep**2 + self.v_cycle[i-1]*self.timestep + self.s_cycle[i-1]
-                self.loader_active_cycle[i] = 0
-                self.container_mass[i] = 0
-                i = i+1
-
-            # constant speed phase
-            while self.s_cycle[i-1] < (self.collection_distance_per_stop - (58.8+8.33)): # distance needed to brake from max speed
-                self.a_cycle[i] = 0
-                self.v_cycle[i] = self.speed_max
-                self.s_cycle[i] = 0.5*self.a_cycle[i]*self.timestep**2 + self.v_cycle[i-1]*self.timestep + self.s_cycle[i-1]
-                self.loader_active_cycle[i] = 0
-                self.container_mass[i] = 0
-                i = i+1
-
-            # braking phase
-            while self.s_cycle[i-1] < self.collection_distance_per_stop and self.v_cycle[i-1] > 0:
-                self.v_cycle[i] = max((self.v_cycle[i-1] - self.acceleration_const*self.timestep), 0)       # [m/s] speed with threshold of 0m/s (to hinder negative speed)
-                self.a_cycle[i] = (self.v_cycle[i] - self.v_cycle[i-1])
-                self.s_cycle[i] = 0.5*self.a_cycle[i]*self.timestep**2 + self.v_cycle[i-1]*self.timestep + self.s_cycle[i-1]
-                self.loader_active_cycle[i] = 0
-                self.container_mass[i] = 0
-                i = i+1
-
-            # save arrays to struct
-            route_speed = np.append(route_speed,self.v_cycle[:i])
-            route_acceleration = np.append(route_acceleration,self.a_cycle[:i])
-            route_loader_active = np.append(route_loader_active,self.loader_active_cycle[:i])
-            route_container_mass = np.append(route_container_mass, self.container_mass[:i])
-            route_distance = np.append(route_distance, self.s_cycle[:i])
-
-
-        # Append last wait and loader phase
-        # wait phase
-        route_speed = np.append(route_speed, np.zeros(self.t_wait-1))
-        route_acceleration = np.append(route_acceleration, np.zeros(self.t_wait-1))
-        route_loader_active = np.append(route_loader_active, np.zeros(self.t_wait-1))
-        route_container_mass = np.append(route_container_mass, np.zeros(self.t_wait-1))
-        route_distance = np.append(route_distance, np.zeros(self.t_wait-1))
-
-        # loader phase
-        route_speed = np.append(route_speed, np.zeros(self.t_loader-1))
-        route_acceleration = np.append(route_acceleration, np.zeros(self.t_loader-1))
-        route_loader_active = np.append(route_loader_active, np.ones(self.t_loader-1))
-        route_container_mass = np.append(route_container_mass, repmat((self.collection_mass_container_per_stop/(self.t_loader-1)),(self.t_loader-1),1))
-        route_distance = np.append(route_distance, np.zeros(self.t_loader-1))
+        # All stop cycles are identical: one cycle is synthesized and repeated for stops_sum-1 stops
+        cycle = self.workphase_cycle()
+        stops_cycle = self.data_route['stops_sum']-1
+
+        ## Append last wait and loader phase
+        # [s] duration of last wait phase (t_wait-1) and loader phase (t_loader-1)
+        t_last = (self.t_wait-1) + (self.t_loader-1)
+        last_loader_active = np.zeros(t_last)
+        last_loader_active[(self.t_wait-1):] = 1
+        last_container_mass = np.zeros(t_last)
+        last_container_mass[(self.t_wait-1):] = self.collection_mass_container_per_stop/(self.t_loader-1)
+
+        # Preallocated route arrays: repeated cycles and last wait and loader phase
+        route_speed = np.concatenate((np.tile(cycle['speed'], stops_cycle), np.zeros(t_last)))
+        route_acceleration = np.concatenate((np.tile(cycle['acceleration'], stops_cycle), np.zeros(t_last)))
+        route_distance = np.concatenate((np.tile(cycle['distance'], stops_cycle), np.zeros(t_last)))
+        route_loader_active = np.concatenate((np.tile(cycle['loader_active'], stops_cycle), last_loader_active))
+        route_container_mass = np.concatenate((np.tile(cycle['container_mass'], stops_cycle), last_container_mass))
 
         #add charger power for all timesteps
         route_type = 2*np.ones(len(route_distance))
@@ -209,6 +158,150 @@ class Route(Serializable):
         return df_workphase
 
 
+    def workphase_cycle(self):
+        '''
+        Method synthesizes a single working cycle of one stop:
+            wait phase, loader phase, acceleration, constant speed and braking to next stop
+        Workphase parameters need to be calculated before (see workphase)
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        dict of numpy arrays: speed, acceleration, distance, loader_active, container_mass
+        '''
+        # [s] duration of a single working cycle
+        duration_cycle = self.t_a + self.t_v_max + self.t_b + self.t_loader + self.t_wait
+
+        #initial values
+        self.a_cycle = np.zeros(duration_cycle)
+        self.v_cycle = np.zeros(duration_cycle)
+        self.s_cycle = np.zeros(duration_cycle)
+        self.loader_active_cycle = np.zeros(duration_cycle)
+        self.container_mass = np.zeros(duration_cycle)
+
+        # Wait phase: all values stay 0 for 0 to t_wait
+
+        # loader phase
+        self.loader_active_cycle[self.t_wait:(self.t_wait+self.t_loader+1)] = 1
+        self.container_mass[self.t_wait:(self.t_wait+self.t_loader+1)] = self.collection_mass_container_per_stop / (self.t_loader)
+        i = self.t_wait+self.t_loader
+
+        # Acceleration phase
+        while self.s_cycle[i-1] < (self.collection_distance_per_stop/2) and self.v_cycle[i-1] < self.speed_max:
+            self.v_cycle[i] = min((self.v_cycle[i-1] + self.acceleration_const*self.timestep), self.speed_max)    # [m/s] speed with threshold of speed_max
+            self.a_cycle[i] = self.v_cycle[i] - self.v_cycle[i-1]
+            self.s_cycle[i] = 0.5*self.a_cycle[i]*self.timestep**2 + self.v_cycle[i-1]*self.timestep + self.s_cycle[i-1]
+            self.loader_active_cycle[i] = 0
+            self.container_mass[i] = 0
+            i = i+1
+
+        # constant speed phase
+        while self.s_cycle[i-1] < (self.collection_distance_per_stop - (58.8+8.33)): # distance needed to brake from max speed
+            self.a_cycle[i] = 0
+            self.v_cycle[i] = self.speed_max
+            self.s_cycle[i] = 0.5*self.a_cycle[i]*self.timestep**2 + self.v_cycle[i-1]*self.timestep + self.s_cycle[i-1]
+            self.loader_active_cycle[i] = 0
+            self.container_mass[i] = 0
+            i = i+1
+
+        # braking phase
+        while self.s_cycle[i-1] < self.collection_distance_per_stop and self.v_cycle[i-1] > 0:
+            self.v_cycle[i] = max((self.v_cycle[i-1] - self.acceleration_const*self.timestep), 0)       # [m/s] speed with threshold of 0m/s (to hinder negative speed)
+            self.a_cycle[i] = (self.v_cycle[i] - self.v_cycle[i-1])
+            self.s_cycle[i] = 0.5*self.a_cycle[i]*self.timestep**2 + self.v_cycle[i-1]*self.timestep + self.s_cycle[i-1]
+            self.loader_active_cycle[i] = 0
+            self.container_mass[i] = 0
+            i = i+1
+
+        return {'speed': self.v_cycle[:i],
+                'acceleration': self.a_cycle[:i],
+                'distance': self.s_cycle[:i],
+                'loader_active': self.loader_active_cycle[:i],
+                'container_mass': self.container_mass[:i]}
+
+
+
+    def chargephase(self, duration, charger_power=None):
+        '''
+        Method creates charge phase load profile: vehicle stands at depot (phase_type 0) and is charged
+        with constant charger power
+
+        Parameters
+        ----------
+        duration: int [s]. Duration of charge phase
+        charger_power: float [W]. Charge power supplied to vehicle, None for charger_power of route json file
+        '''
+        if charger_power is None:
+            charger_power = self.charger_power
+
+        df_chargephase = pd.DataFrame({'speed':np.zeros(duration),
+                                       'acceleration':np.zeros(duration),
+                                       'distance':np.zeros(duration),
+                                       'loader_active':np.zeros(duration),
+                                       'container_mass':np.zeros(duration),
+                                       'phase_type':np.zeros(duration),
+                                       'charger_power':np.full(duration, float(charger_power))})
+
+        return df_chargephase
+
+
+    def add_chargephase(self, duration, charger_power=None):
+        '''
+        Method appends charge phase (e.g. break or overnight charging) to route profile profile_day
+        A new profile is created, profiles shared by the profile cache are not modified, compact profiles stay compact
+
+        Parameters
+        ----------
+        duration: int [s]. Duration of charge phase
+        charger_power: float [W]. Charge power supplied to vehicle, None for charger_power of route json file
+        '''
+        if isinstance(self.profile_day, CompactProfile):
+            self.profile_day = CompactProfile(pd.concat([self.profile_day.to_dataframe(),
+                                                         self.chargephase(duration, charger_power)], ignore_index=True))
+        else:
+            self.profile_day = pd.concat([self.profile_day, self.chargephase(duration, charger_power)], ignore_index=True)
+
+
+    def get_segments(self, profile=None):
+        '''
+        Method run length encodes route profile into segments of consecutive timesteps with constant inputs
+        (speed, acceleration, loader_active, container_mass, phase_type, charger_power), in which vehicle power is
+        constant. Standing timesteps with container mass (vehicle power independent of mass) are merged as well,
+        their container mass is summed, driving timesteps with container mass are single timestep segments
+
+        Parameters
+        ----------
+        profile: DataFrame or CompactProfile. Route profile, None for profile_day
+
+        Returns
+        -------
+        DataFrame: segment profile with columns of route profile (container_mass summed over segment),
+            time [s] of first timestep and duration [s] of each segment
+        '''
+        if profile is None:
+            profile = self.profile_day
+
+        columns = ['speed', 'acceleration', 'loader_active', 'phase_type', 'charger_power']
+        values = np.column_stack([np.asarray(profile[column], dtype=float) for column in columns])
+        container_mass = np.asarray(profile.container_mass, dtype=float)
+
+        # New segment at changed inputs and at driving timesteps with container mass (changed vehicle mass)
+        start = np.ones(len(values), dtype=bool)
+        start[1:] = np.any(values[1:] != values[:-1], axis=1)
+        start |= (values[:,0] != 0) & (container_mass != 0)
+        start = np.flatnonzero(start)
+
+        segments = pd.DataFrame(values[start], columns=columns)
+        segments['container_mass'] = np.add.reduceat(container_mass, start) if len(start) else container_mass
+        segments['phase_type'] = segments['phase_type'].astype(np.asarray(profile.phase_type).dtype)
+        segments['time'] = start
+        segments['duration'] = np.diff(np.append(start, len(values)))
+
+        return segments
+
 
     def drivephase(self, phase_distance):
         '''
@@ -226,10 +319,10 @@ class Route(Serializable):
         # Define stopping distance for braking at end of drive there and drive back
         stopping_distance = 0
 
-        #Get data from drivecycle and convert to numpy array
-        drivecycle_speed = self.drivecycle.get_speed().values
-        drivecycle_acceleration = self.drivecycle.get_acceleration().values
-        drivecycle_distance = self.drivecycle.get_distance().values
+        #Get data from drivecycle as numpy arrays
+        drivecycle_speed = self.drivecycle.get_speed()
+        drivecycle_acceleration = self.drivecycle.get_acceleration()
+        drivecycle_distance = self.drivecycle.get_distance()
 
         ## Get part of driving cycle
         # in case drive distance is shorter than dc distance
@@ -245,17 +338,18 @@ class Route(Serializable):
         else:
             # get howl muliple of full cycles & the "rest" (decimal place) of the cycle
             duration = (phase_distance / drivecycle_distance[-1])
-            rest = math.floor((duration - math.floor(duration)) * len(drivecycle_distance))
+            cycles = math.floor(duration)
+            rest = math.floor((duration - cycles) * len(drivecycle_distance))
 
             # dc values are repeated to distance (whole multiple) & the "rest" (decimal place)
-            route_speed = repmat(drivecycle_speed, 1, math.floor(duration)).flatten()
-            route_speed = np.append(route_speed, drivecycle_speed[0:rest])
+            route_speed = np.concatenate((np.tile(drivecycle_speed, cycles), drivecycle_speed[0:rest]))
+            route_acceleration = np.concatenate((np.tile(drivecycle_acceleration, cycles), drivecycle_acceleration[0:rest]))
 
-            route_acceleration = repmat(drivecycle_acceleration, 1, math.floor(duration)).flatten()
-            route_acceleration = np.append(route_acceleration, drivecycle_acceleration[0:rest])
-
-            route_distance = repmat(drivecycle_distance, 1, math.floor(duration)).flatten()
-            route_distance = np.append(route_distance, drivecycle_distance[0:rest])
+            # dc distance is accumulated over repeated cycles (sequential sum, so each cycle starts at end of last cycle)
+            distance_offset = np.repeat(np.concatenate(([0.], np.cumsum(np.full(cycles, drivecycle_distance[-1])))),
+                                        len(drivecycle_distance))
+            route_distance = np.concatenate((np.tile(drivecycle_distance, cycles), drivecycle_distance[0:rest])) \
+                             + distance_offset[:(cycles*len(drivecycle_distance) + rest)]
 
 
         ## Append stopping event to drive cycle
@@ -264,13 +358,18 @@ class Route(Serializable):
         speed_stopping = route_speed[-1]
         #distance_stopping = phase_distance - route_distance[-1]
 
-        # Append speed, acceleration and distance value to route array
-        while speed_stopping > abs(acceleration_stopping):
-            route_speed = np.append(route_speed, (speed_stopping + acceleration_stopping))
-            route_acceleration = np.append(route_acceleration, acceleration_stopping)
-            route_distance = np.append(route_distance, (max(route_distance) + (speed_stopping-acceleration_stopping)))
+        # Number of stopping steps till speed is lower than stopping deceleration
+        steps_stopping = max(0, math.ceil((speed_stopping - abs(acceleration_stopping)) / abs(acceleration_stopping)))
+        # Speed before each stopping step
+        speed_stopping = speed_stopping + np.arange(steps_stopping) * acceleration_stopping
 
-            speed_stopping = speed_stopping + acceleration_stopping
+        # Append speed, acceleration and distance value to route array
+        route_speed = np.concatenate((route_speed, speed_stopping + acceleration_stopping))
+        route_acceleration = np.concatenate((route_acceleration, np.full(steps_stopping, acceleration_stopping, dtype=float)))
+        # Distance is accumulated from maximum distance of route array
+        route_distance = np.concatenate((route_distance,
+                                         np.cumsum(np.concatenate(([np.max(route_distance)],
+                                                                   speed_stopping - acceleration_stopping)))[1:]))
 
 
         # Add loader active and container_mass fields to array with 0
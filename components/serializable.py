@@ -1,4 +1,9 @@
 import json
+import os
+
+# Parsed json files of current process {file_path: (modification time, data)}
+json_cache = dict()
+
 
 class Serializable:
     '''
@@ -23,23 +28,29 @@ class Serializable:
         self.file_path = file_path
 
 
-    def load(self, file_path = None):
+    def load(self, file_path = None, parameters = None):
         '''
         Load method to load component parameter form json file
 
         Parameters
         ----------
         file_path : string. File path where to store json file
+        parameters : dict. Parameters overriding values of json file
         '''
         # if no file_path is specified via load method it is taken from __init__method
         if not file_path:
             file_path = self.file_path
 
-        # open json file from file_path
-        with open(file_path, "r") as json_file:
-            data = json.load(json_file)
-            # Integrate content of json in component __init__ class
-            self.__dict__ = data
+        # open json file from file_path, each file is only parsed once per process as long as it is not modified
+        modification_time = os.path.getmtime(file_path)
+        if file_path not in json_cache or json_cache[file_path][0] != modification_time:
+            with open(file_path, "r") as json_file:
+                json_cache[file_path] = (modification_time, json.load(json_file))
+
+        # Integrate copy of json content in component __init__ class
+        self.__dict__ = dict(json_cache[file_path][1])
+        if parameters:
+            self.__dict__.update(parameters)
 
 
     def save(self, file_path = None):
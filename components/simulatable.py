@@ -1,3 +1,8 @@
+from time import perf_counter
+
+from event_log import EventLog
+
+
 class Simulatable:
     '''
     Simulatable class - Parent class for System Simulation
@@ -6,7 +11,9 @@ class Simulatable:
 
     Attributes
     ----------
-    *childs : class. All classes which shall be simulated
+    *childs : class. All classes which shall be simulated (only Simulatable childs are kept)
+    profiling : dict. Calls, time [s] and branch counters of calculate, None if profiling is disabled
+    event_log : EventLog. Log of component events (e.g. warnings), shared by all components of a simulation
 
     Methods
     -------
@@ -14,6 +21,9 @@ class Simulatable:
     start
     end
     update
+    enable_profiling
+    disable_profiling
+    count_branches
     '''
 
     def __init__(self, *childs):
@@ -24,7 +34,12 @@ class Simulatable:
         '''
         #self.step_width = step_width
         self.time = -1
-        self.childs = list(childs)
+        # Childs are checked once here instead of every timestep
+        self.childs = [child for child in childs if isinstance(child, Simulatable)]
+        # Profiling is disabled by default
+        self.profiling = None
+        # Own event log, replaced by simulation event log
+        self.event_log = EventLog()
 
 
     def calculate(self):
@@ -51,8 +66,7 @@ class Simulatable:
         self.time = 0
         # Calls start method for all simulatable childs
         for child in self.childs:
-            if isinstance(child, Simulatable):
-                child.start()
+            child.start()
 
 
     def end(self):
@@ -68,8 +82,7 @@ class Simulatable:
         self.time = 0
         # Calls end method for all simulatable childs
         for child in self.childs:
-            if isinstance(child, Simulatable):
-                child.end()
+            child.end()
 
 
     def update(self):
@@ -87,5 +100,59 @@ class Simulatable:
         self.time += 1
         # Calls update method for all simulatable childs
         for child in self.childs:
-            if isinstance(child, Simulatable):
-                child.update()
\ No newline at end of file
+            child.update()
+
+
+    def enable_profiling(self):
+        '''
+        Method enables profiling of calculate for this simulatable and all childs:
+        cumulative time, number of calls and branch counters (see count_branches)
+        The calculate method is wrapped per instance, disabled profiling has no overhead
+
+        Parameters
+        ----------
+        None
+        '''
+        self.profiling = {'calls': 0, 'time': 0., 'counters': dict()}
+        calculate = type(self).calculate
+
+        def calculate_profiled():
+            start = perf_counter()
+            calculate(self)
+            self.profiling['time'] += perf_counter() - start
+            self.profiling['calls'] += 1
+            # Branch outcomes are counted outside of measured time
+            self.count_branches(self.profiling['counters'])
+
+        # Instance attribute shadows class method
+        self.calculate = calculate_profiled
+
+        for child in self.childs:
+            child.enable_profiling()
+
+
+    def disable_profiling(self):
+        '''
+        Method disables profiling for this simulatable and all childs, profiling results are discarded
+
+        Parameters
+        ----------
+        None
+        '''
+        self.__dict__.pop('calculate', None)
+        self.profiling = None
+
+        for child in self.childs:
+            child.disable_profiling()
+
+
+    def count_branches(self, counters):
+        '''
+        Null method - stands for branch counters of component classes, called after each profiled calculate
+        Components increment counters of branch outcomes of the current timestep e.g. counters['motor_overflow']
+
+        Parameters
+        ----------
+        counters : dict. Branch counters {branch: count}
+        '''
+        pass
@@ -19,6 +19,8 @@ class Vehicle(Serializable, Simulatable):
     -------
     start
     calculate
+    calculate_vectorized
+    count_branches
     vehicle_driving_resistance
     vehicle_motor_electric
     vehicle_motor_diesel
@@ -27,17 +29,18 @@ class Vehicle(Serializable, Simulatable):
     '''
 
 
-    def __init__(self, timestep, input_link, file_path = None):
+    def __init__(self, timestep, input_link, file_path = None, parameters = None):
         '''
         Parameters
         ----------
         timestep: int. Simulation timestep in seconds
         input_link: class. Class of component which supplies input power
         file_path : json file to load vehicle parameters
+        parameters : dict. Component parameters overriding values of json file
         '''
         # Read component parameters from json file
         if file_path:
-            self.load(file_path)
+            self.load(file_path, parameters)
 
         else:
             print('Attention: No json file for vehicle model specified')
@@ -56,6 +59,9 @@ class Vehicle(Serializable, Simulatable):
         # Initial cummulated vehicle mass (mass_empty + waste mass)
         self.mass_cum =self. mass_empty
 
+        # Drivetrain efficiency motor [1]
+        self.eta_drivetrain = self.efficiency_motor * self.efficiency_transmission * self.efficiency_converter
+
         # Gravity [m/s2]
         self.grafity = 9.81
 
@@ -110,6 +116,151 @@ class Vehicle(Serializable, Simulatable):
             self.power_motor = 0
             self.power_loader_motor = 0
             self.power = self.input_link.charger_power[self.time]
+            self.power_electric = self.power
+            self.power_diesel = 0
+
+
+    def calculate_vectorized(self, profile = None):
+        '''
+        Vectorized calculation: Method calculates all vehicle power flows for a whole route profile at once
+        Results are identical to calling calculate for each timestep, as vehicle has no feedback of downstream components
+        Cummulated vehicle mass starts at current mass_cum and mass_cum is set to last value afterwards,
+        time index is advanced by length of profile (timesteps of events)
+        Segment profiles (see Route.get_segments) with column duration are calculated per segment, events are
+        recorded once at first timestep of segment
+
+        Parameters
+        ----------
+        profile: DataFrame. Route profile with columns speed, acceleration, loader_active, container_mass,
+            phase_type and charger_power (optional duration). If None, input_link is used
+
+        Returns
+        -------
+        dict of numpy arrays: mass_cum, power_drive, power_loader_motor, power_motor,
+            power, power_electric, power_diesel, eta_drivetrain
+        '''
+        if profile is None:
+            profile = self.input_link
+
+        speed = np.asarray(profile.speed, dtype=float)
+        acceleration = np.asarray(profile.acceleration, dtype=float)
+        loader_active = np.asarray(profile.loader_active, dtype=float)
+        container_mass = np.asarray(profile.container_mass, dtype=float)
+        phase_type = np.asarray(profile.phase_type)
+        charger_power = np.asarray(profile.charger_power, dtype=float)
+        # Timesteps of rows (events), segments start at time of first timestep
+        if 'duration' in profile:
+            duration = np.asarray(profile.duration)
+        else:
+            duration = np.ones(len(speed), dtype=int)
+        time = self.time + np.cumsum(duration) - duration
+
+        # Vehicle mass, sequential cumsum with initial mass to keep summation order of step calculation
+        mass_cum = np.cumsum(np.concatenate(([self.mass_cum], container_mass)))[1:]
+        # Vehicle is in operating (driving(1) or working(2)) mode, otherwise charge mode
+        operating = (phase_type != 0)
+
+        ## Vehicle loader
+        power_hydraulic = self.power_hydraulic_mean * loader_active
+        power_loader_motor = power_hydraulic / self.efficiency_loader
+
+        ## Vehicle driving resistance
+        mass_rotational = mass_cum * self.m_add
+        F_air = 0.5 * self.rho_air * self.cw * self.front_area * speed**2
+        F_r = mass_rotational * self.grafity * self.cr * math.cos(self.alpha)
+        F_sl = mass_rotational * self.grafity * math.sin(self.alpha)
+        F_a = mass_rotational * acceleration
+        power_drive = ((F_air + F_r + F_sl + F_a) * speed)
+
+        ## Vehicle motor, branches in same order as vehicle_motor
+        if self.specification == 'vehicle_electric':
+            power_motor = np.select([(power_drive >= 0) & (power_drive < self.power_motor_max),
+                                     (power_drive >= 0) & (power_drive > self.power_motor_max),
+                                     (power_drive <= 0) & (power_drive > -self.power_motor_max),
+                                     (power_drive <= 0) & (power_drive < -self.power_motor_max)],
+                                    [power_drive / self.eta_drivetrain,
+                                     power_drive / self.eta_drivetrain,
+                                     power_drive * self.eta_drivetrain,
+                                     -self.power_motor_max],
+                                    default=0.)
+            overflow = np.flatnonzero(operating & (power_drive > self.power_motor_max))
+            self.event_log.record_array('vehicle', 'motor_overflow', time[overflow],
+                                        power_drive[overflow] - self.power_motor_max)
+            overflow = np.flatnonzero(operating & (power_drive < -self.power_motor_max))
+            self.event_log.record_array('vehicle', 'generator_overflow', time[overflow],
+                                        power_drive[overflow] + self.power_motor_max)
+            power_vehicle = (-1)*(power_motor + power_loader_motor + self.power_aux)
+            power_electric = power_vehicle
+            power_diesel = np.zeros(len(speed))
+
+        elif self.specification == 'vehicle_diesel':
+            power_motor = np.select([(power_drive > 0) & (power_drive < self.power_motor_max),
+                                     (power_drive > 0) & (power_drive > self.power_motor_max),
+                                     (power_drive == 0) & (power_loader_motor == 0)],
+                                    [power_drive / self.eta_drivetrain,
+                                     power_drive / self.eta_drivetrain,
+                                     10.4 * 3 * 1000],
+                                    default=0.)
+            overflow = np.flatnonzero(operating & (power_drive > self.power_motor_max))
+            self.event_log.record_array('vehicle', 'motor_overflow', time[overflow],
+                                        power_drive[overflow] - self.power_motor_max)
+            power_diesel = (-1)*(power_motor + power_loader_motor + self.power_aux)
+            power_vehicle = np.zeros(len(speed))
+            power_electric = power_vehicle
+
+        else:
+            print('no vehicle specification defined in json file!')
+            power_motor = np.zeros(len(speed))
+            power_vehicle = np.zeros(len(speed))
+            power_electric = power_vehicle
+            power_diesel = power_vehicle
+
+        ## Vehicle in charge modus
+        power_drive = np.where(operating, power_drive, 0.)
+        power_motor = np.where(operating, power_motor, 0.)
+        power_loader_motor = np.where(operating, power_loader_motor, 0.)
+        power_vehicle = np.where(operating, power_vehicle, charger_power)
+        power_electric = np.where(operating, power_electric, charger_power)
+        power_diesel = np.where(operating, power_diesel, 0.)
+
+        # Keep vehicle mass state and time index for consecutive calls
+        if len(mass_cum):
+            self.mass_cum = mass_cum[-1]
+        self.time += int(duration.sum())
+
+        return {'mass_cum': mass_cum,
+                'power_drive': power_drive,
+                'power_loader_motor': power_loader_motor,
+                'power_motor': power_motor,
+                'power': power_vehicle,
+                'power_electric': power_electric,
+                'power_diesel': power_diesel,
+                'eta_drivetrain': np.full(len(speed), self.eta_drivetrain)}
+
+
+    def count_branches(self, counters):
+        '''
+        Profiling: Method counts branch outcomes of current timestep (see Simulatable.enable_profiling)
+            motor_overflow / generator_overflow: drive power exceeds maximum motor power
+            diesel_idle: diesel engine idle self consumption
+            charge: vehicle in charge mode
+
+        Parameters
+        ----------
+        counters : dict. Branch counters {branch: count}
+        '''
+        if self.input_link.phase_type[self.time] == 0:
+            branch = 'charge'
+        elif self.power_drive >= 0 and self.power_drive > self.power_motor_max:
+            branch = 'motor_overflow'
+        elif self.specification == 'vehicle_electric' and self.power_drive < -self.power_motor_max:
+            branch = 'generator_overflow'
+        elif self.specification == 'vehicle_diesel' and self.power_drive == 0 and self.power_loader_motor == 0:
+            branch = 'diesel_idle'
+        else:
+            return
+
+        counters[branch] = counters.get(branch, 0) + 1
 
 
     def vehicle_driving_resistance(self):
@@ -159,7 +310,7 @@ class Vehicle(Serializable, Simulatable):
                 # Motor inlet power [W]
                 self.power_motor = self.power_drive / self.eta_drivetrain
                 self.power_motor_max_overflow = 1
-                print('vehicle engine in motor mode exceeds maximum engine power!')
+                self.event_log.record('vehicle', 'motor_overflow', self.time, self.power_drive - self.power_motor_max)
 
             # Engine in generator mode and lower than maximum motor power
             elif self.power_drive <= 0 and self.power_drive > -self.power_motor_max:
@@ -171,7 +322,7 @@ class Vehicle(Serializable, Simulatable):
                 # Motor inlet power [W]
                 self.power_motor = - self.power_motor_max
                 self.power_motor_max_overflow = -1
-                print('vehicle engine in generator mode exceeds maximum engine power!')
+                self.event_log.record('vehicle', 'generator_overflow', self.time, self.power_drive + self.power_motor_max)
 
             # Engine with no power or in generator mode & above maximum motor power
             else:
@@ -189,7 +340,7 @@ class Vehicle(Serializable, Simulatable):
                 # Motor inlet power [W]
                 self.power_motor = self.power_drive / self.eta_drivetrain
                 self.power_motor_max_overflow = 1
-                print('vehicle engine in motor mode exceeds maximum engine power!')
+                self.event_log.record('vehicle', 'motor_overflow', self.time, self.power_drive - self.power_motor_max)
 
             # Self consumption in idle mode (10.4 kWh/l * 3 l/h)
             elif self.power_drive == 0 and self.power_loader_motor == 0:
@@ -1,5 +1,8 @@
+import os
+import numpy as np
 import pandas
 
+
 class CSV:
     '''
     CSV loader for loading csv file of load profile
@@ -46,9 +49,90 @@ class CSV:
         return self.__data_set[:][i]
 
 
+class DriveCycleStore:
+    '''
+    Store of drive cycles: each drive cycle csv file is parsed only once per process
+    Speed, acceleration and distance are kept as one contiguous read only float array [3, timesteps],
+    optionally persisted as memory mapped .npy sidecar file next to the csv file
+
+    Attributes
+    ----------
+    persist : bool. Write/read .npy sidecar files, invalidated if csv file is modified
+
+    Methods
+    -------
+    get
+    clear
+    '''
+
+    def __init__(self, persist=False):
+        '''
+        Parameters
+        ----------
+        persist : bool. Write/read .npy sidecar files
+        '''
+        self.persist = persist
+        # Drive cycles {file_name: (modification time, data)}
+        self.cycles = dict()
+
+
+    def get(self, file_name):
+        '''
+        Method returns drive cycle data, parsed/loaded only if not in store or csv file modified
+
+        Parameters
+        ----------
+        file_name : str. File path and name of drive cycle csv file
+
+        Returns
+        -------
+        read only numpy array [3, timesteps]: speed, acceleration, distance
+        '''
+        modification_time = os.path.getmtime(file_name)
+        if file_name in self.cycles and self.cycles[file_name][0] == modification_time:
+            return self.cycles[file_name][1]
+
+        file_name_sidecar = file_name + '.npy'
+        # Valid sidecar file: newer than csv file
+        if self.persist and os.path.exists(file_name_sidecar) \
+                and os.path.getmtime(file_name_sidecar) >= modification_time:
+            data = np.load(file_name_sidecar, mmap_mode='r')
+
+        else:
+            data_set = pandas.read_csv(file_name, comment='#', header=None, decimal='.', sep=';')
+            data = np.ascontiguousarray(data_set.iloc[:, 0:3].to_numpy(dtype=float).T)
+            data.flags.writeable = False
+
+            if self.persist:
+                # Write to temporary file first, so parallel processes never read incomplete files
+                file_name_temporary = file_name_sidecar + '.' + str(os.getpid()) + '.npy'
+                np.save(file_name_temporary, data)
+                os.replace(file_name_temporary, file_name_sidecar)
+
+        self.cycles[file_name] = (modification_time, data)
+
+        return data
+
+
+    def clear(self):
+        '''
+        Method removes all drive cycles from store, sidecar files are kept
+
+        Parameters
+        ----------
+        None
+        '''
+        self.cycles.clear()
+
+
+# Drive cycle store of current process
+drivecycle_store = DriveCycleStore()
+
+
 class DriveCycle(CSV):
     '''
     Data loader for extracting data from drivecycle csv file
+    Drive cycles are taken from drivecycle_store, profiles are returned as read only numpy views (no copy)
 
     Attributes
     ----------
@@ -56,19 +140,30 @@ class DriveCycle(CSV):
 
     Methods
     -------
+    read_csv
     get_speed
     get_acceleration
     get_distance
     '''
 
+    def read_csv(self, file_name):
+        '''gets drive cycle of csv file from drivecycle_store
+
+        Parameters
+        -----------
+        file_name : str
+            file path and name of csv file
+        '''
+        self.data = drivecycle_store.get(file_name)
+
     def get_speed(self):
         '''returns speed profile'''
-        return super().get_colomn(0)
+        return self.data[0]
 
     def get_acceleration(self):
         '''returns acceleration profile'''
-        return super().get_colomn(1)
+        return self.data[1]
 
     def get_distance(self):
         '''returns distance profile'''
-        return super().get_colomn(2)
\ No newline at end of file
+        return self.data[2]
@@ -0,0 +1,239 @@
+import heapq
+import math
+
+import numpy as np
+import pandas as pd
+
+from components.charger import Charger
+
+
+class Depot:
+    '''
+    Event driven depot charging simulation of several vehicles sharing one grid connection
+    Vehicles arrive with the battery state at the end of their tour (simulated Simulation), are charged until
+    target state of charge or departure and leave. Charge power is allocated at events only (arrival, departure,
+    charge target reached): between events all charge powers are constant and batteries are calculated with the
+    battery kernel over the whole interval, vehicles without charge power are not calculated
+
+    Attributes
+    ----------
+    power_grid_max : float [W]. Maximum power of depot grid connection
+    power_charger_max : float [W]. Maximum grid power of each vehicle charger
+    policy : str. Power allocation, equal (equal share of grid power) or first_come (in order of arrival)
+    charger : Charger. Charger model, static charge efficiency
+    vehicles : dict. {vehicle_id: vehicle state}
+
+    Methods
+    -------
+    add_vehicle
+    allocate
+    charge
+    simulate
+    '''
+
+    def __init__(self, power_grid_max, power_charger_max=22000., policy='equal',
+                 charger_file='data/components/charger_ac.json'):
+        '''
+        Parameters
+        ----------
+        power_grid_max : float [W]. Maximum power of depot grid connection
+        power_charger_max : float [W]. Maximum grid power of each vehicle charger
+        policy : str. equal or first_come
+        charger_file : json file. Charger parameter file
+        '''
+        if policy not in ['equal', 'first_come']:
+            raise ValueError('Unknown charge policy ' + policy + ', use equal or first_come')
+
+        self.power_grid_max = power_grid_max
+        self.power_charger_max = power_charger_max
+        self.policy = policy
+        self.charger = Charger(power_grid=power_charger_max, file_path=charger_file)
+        self.vehicles = dict()
+
+
+    def add_vehicle(self, vehicle_id, sim, arrival, departure, state_of_charge_target=0.9):
+        '''
+        Method adds vehicle to depot, battery state of simulation is continued and modified by depot charging
+
+        Parameters
+        ----------
+        vehicle_id : str. Vehicle id
+        sim : Simulation. Simulated electric vehicle (battery state at end of tour)
+        arrival : int [s]. Arrival time at depot
+        departure : int [s]. Departure time from depot, vehicle is not charged if equal to arrival
+        state_of_charge_target : float [1]. Charge target
+        '''
+        if departure < arrival:
+            raise ValueError('Departure of vehicle ' + str(vehicle_id) + ' before arrival')
+
+        self.vehicles[vehicle_id] = {'battery': sim.battery,
+                                     'battery_management': sim.battery_management,
+                                     'arrival': int(arrival),
+                                     'departure': int(departure),
+                                     'state_of_charge_target': state_of_charge_target,
+                                     'state_of_charge_arrival': sim.battery.state_of_charge,
+                                     'energy_grid': 0.,
+                                     'energy_battery': 0.,
+                                     'charge_end': np.nan}
+
+
+    def allocate(self, charging):
+        '''
+        Method allocates grid power to charging vehicles
+
+        Parameters
+        ----------
+        charging : list. Ids of charging vehicles in order of arrival
+
+        Returns
+        -------
+        dict: {vehicle_id: grid power [W]}
+        '''
+        if not charging:
+            return dict()
+
+        if self.policy == 'equal':
+            power = min(self.power_charger_max, self.power_grid_max / len(charging))
+            return {vehicle_id: power for vehicle_id in charging}
+
+        # First come: full charger power in order of arrival until grid power is used
+        allocation = dict()
+        power_available = self.power_grid_max
+        for vehicle_id in charging:
+            allocation[vehicle_id] = min(self.power_charger_max, power_available)
+            power_available -= allocation[vehicle_id]
+
+        return allocation
+
+
+    def charge(self, vehicle, power_grid, duration):
+        '''
+        Method charges vehicle battery with constant grid power for duration, battery state is updated
+
+        Parameters
+        ----------
+        vehicle : dict. Vehicle state
+        power_grid : float [W]. Grid power
+        duration : int [s]. Charge duration
+
+        Returns
+        -------
+        dict of numpy arrays: battery results (see Battery.calculate_vectorized)
+        '''
+        # Charger and battery management at constant power
+        power_charger = power_grid * self.charger.efficiency_charging
+        power_battery_management = vehicle['battery_management'].calculate_vectorized(
+                                       np.array([power_charger]))['power'][0]
+
+        return vehicle['battery'].calculate_vectorized(np.full(duration, power_battery_management))
+
+
+    def simulate(self):
+        '''
+        Method simulates depot charging of all vehicles with event queue
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: charge results per vehicle
+        DataFrame: depot grid power, piecewise constant from each time on
+        '''
+        # Event queue: (time, event, order, vehicle_id), departures (0) before arrivals (1) at same time
+        events = list()
+        for order, (vehicle_id, vehicle) in enumerate(self.vehicles.items()):
+            heapq.heappush(events, (vehicle['arrival'], 1, order, vehicle_id))
+            heapq.heappush(events, (vehicle['departure'], 0, order, vehicle_id))
+
+        charging = list()
+        load = list()
+        time = events[0][0] if events else 0
+        while events:
+            ## Process all events at current time
+            while events and events[0][0] <= time:
+                _, event, _, vehicle_id = heapq.heappop(events)
+                vehicle = self.vehicles[vehicle_id]
+                if event == 1:
+                    # Vehicle departed already (departure at arrival time)
+                    if time >= vehicle['departure']:
+                        continue
+                    if vehicle['battery'].state_of_charge < vehicle['state_of_charge_target']:
+                        charging.append(vehicle_id)
+                    else:
+                        vehicle['charge_end'] = time
+                elif vehicle_id in charging:
+                    charging.remove(vehicle_id)
+
+            allocation = self.allocate(charging)
+            load.append((time, sum(allocation.values())))
+            if not events:
+                break
+
+            # No charging vehicles: jump to next event
+            if not charging:
+                time = events[0][0]
+                continue
+
+            ## Charge interval until next event, limited by estimated time to charge target
+            time_end = events[0][0]
+            for vehicle_id in charging:
+                battery = self.vehicles[vehicle_id]['battery']
+                energy = (self.vehicles[vehicle_id]['state_of_charge_target'] - battery.state_of_charge) \
+                         * battery.capacity_current_wh
+                power = allocation[vehicle_id] * self.charger.efficiency_charging
+                if power > 0:
+                    time_end = min(time_end, time + math.ceil(1.2 * energy / power * 3600) + 60)
+
+            # Batteries charged over interval, first reached charge target (or charge boundary) ends interval
+            results = dict()
+            steps = time_end - time
+            for vehicle_id in charging:
+                vehicle = self.vehicles[vehicle_id]
+                if allocation[vehicle_id] <= 0:
+                    continue
+                results[vehicle_id] = self.charge(vehicle, allocation[vehicle_id], steps)
+                full = np.flatnonzero((results[vehicle_id]['state_of_charge'] >= vehicle['state_of_charge_target'])
+                                      | (results[vehicle_id]['power_battery'] <= 0))
+                if len(full):
+                    steps = min(steps, full[0] + 1)
+
+            ## Battery states at end of interval, charged energies and completed vehicles
+            for vehicle_id, result in results.items():
+                vehicle = self.vehicles[vehicle_id]
+                battery = vehicle['battery']
+                battery.state_of_charge = result['state_of_charge'][steps-1]
+                battery.temperature = result['temperature'][steps-1]
+                battery.power_loss = result['power_loss'][steps-1]
+                battery.power_battery = result['power_battery'][steps-1]
+                battery.efficiency = result['efficiency'][steps-1]
+                battery.charge_discharge_boundary = result['charge_discharge_boundary'][steps-1]
+
+                vehicle['energy_grid'] += allocation[vehicle_id] * steps / 3600
+                vehicle['energy_battery'] += result['power_battery'][:steps].sum() / 3600
+
+                if battery.state_of_charge >= vehicle['state_of_charge_target'] or battery.power_battery <= 0:
+                    vehicle['charge_end'] = time + steps
+                    charging.remove(vehicle_id)
+
+            time += steps
+
+        results_vehicles = pd.DataFrame([{'vehicle': vehicle_id,
+                                          'arrival': vehicle['arrival'],
+                                          'departure': vehicle['departure'],
+                                          'charge_end': vehicle['charge_end'],
+                                          'state_of_charge_arrival': vehicle['state_of_charge_arrival'],
+                                          'state_of_charge_departure': vehicle['battery'].state_of_charge,
+                                          'state_of_charge_target': vehicle['state_of_charge_target'],
+                                          'target_reached': vehicle['battery'].state_of_charge
+                                                            >= vehicle['state_of_charge_target'],
+                                          'energy_grid': vehicle['energy_grid'],
+                                          'energy_battery': vehicle['energy_battery']}
+                                         for vehicle_id, vehicle in self.vehicles.items()]).set_index('vehicle')
+
+        # Grid power from each time on, consecutive equal values are merged
+        results_load = pd.DataFrame(load, columns=['time', 'power_grid']).drop_duplicates('time', keep='last')
+        results_load = results_load[~np.isclose(results_load['power_grid'].diff(), 0)].set_index('time')
+
+        return results_vehicles, results_load
@@ -0,0 +1,150 @@
+import pandas as pd
+import numpy as np
+from collections import OrderedDict
+
+from components.charger import Charger
+from components.power_component import Power_Component
+from components.battery import Battery
+
+
+# Evaluation parameters of all vehicle specifications (see get_results_parameter), columns of parameter tables
+parameter_names = ['route_distance', 'waste_mass', 'energy_motor', 'energy_loader', 'energy_recuperation',
+                   'energy_consumption', 'energy_charge', 'energy', 'energy_per_km', 'energy_per_kg',
+                   # Electric vehicle
+                   'battery_c_rate_max', 'battery_soc_min', 'battery_soc_end', 'battery_temperature_max',
+                   # Diesel vehicle
+                   'fuel', 'fuel_per_100km', 'co2', 'co2_per_km']
+
+
+def get_results_powerflows(sim):
+    '''
+    Summarizes route data and simulated power flows of a simulation in one DataFrame with Datetimeindex
+
+    Parameters
+    ----------
+    sim: Simulation. Simulated simulation instance
+
+    Returns
+    -------
+    DataFrame: power flows of all timesteps
+    '''
+    results_powerflows = pd.DataFrame(
+                            data=OrderedDict({'route_type':sim.route.profile_day.phase_type,
+                                              'route_speed':sim.route.profile_day.speed,
+                                              'route_acceleration':sim.route.profile_day.acceleration,
+                                              'route_distance':sim.route.profile_day.distance,
+                                              'route_loader_active':sim.route.profile_day.loader_active,
+                                              'route_container_mass':sim.route.profile_day.container_mass,
+                                              'vehicle_mass_cum':sim.vehicle_mass_cum,
+                                              'vehicle_power_drive':sim.vehicle_power_drive,
+                                              'vehicle_power_loader':sim.vehicle_power_loader,
+                                              'vehicle_power_motor':sim.vehicle_power_motor,
+                                              'vehicle_power_electric':sim.vehicle_power_electric,
+                                              'vehicle_power_diesel':sim.vehicle_power_diesel,
+                                              'vehicle_eta':sim.vehicle_efficiency_drivetrain,
+                                              'battery_management_power':sim.battery_management_power,
+                                              'battery_management_eta':sim.battery_management_efficiency,
+                                              'battery_power':sim.battery_power,
+                                              'battery_c-rate':np.abs(sim.battery_power/sim.battery.capacity_nominal_wh),
+                                              'battery_soc':sim.battery_state_of_charge,
+                                              'battery_eta':sim.battery_efficiency}),
+                            copy=False)
+
+    # Set Datetimeindex
+    datetimeindex_day = pd.date_range('01.01.2020 07:00:00', periods=len(sim.route.profile_day.speed), freq='s')
+    results_powerflows['date'] = datetimeindex_day
+    results_powerflows = results_powerflows.set_index('date')
+
+    return results_powerflows
+
+
+def get_results_parameter(sim):
+    '''
+    Calculates evaluation parameters (KPIs) of a simulation: waste mass, energy consumption and specific energy
+    KPIs are taken from the running accumulators sim.kpi, result time series are not needed
+
+    Parameters
+    ----------
+    sim: Simulation. Simulated simulation instance
+
+    Returns
+    -------
+    dict: evaluation parameters
+    '''
+    data_route = sim.route.data_route
+    kpi = sim.kpi
+    results_parameter = {}
+
+    # Route distance
+    results_parameter['route_distance'] = data_route['overall_distance']
+    # Waste mass collected
+    results_parameter['waste_mass'] = (kpi.mass_max - sim.vehicle.mass_empty)
+    # Sum of energy consumption for vehicle motor
+    results_parameter['energy_motor'] = kpi.energy_motor
+    # Sum of energy consumption for vehicle loader
+    results_parameter['energy_loader'] = kpi.energy_loader
+
+    if sim.vehicle.specification == 'vehicle_electric':
+        ## ELECTRO
+        charger = Charger(power_grid=22000,
+                          file_path='data/components/charger_ac.json')
+        charger.calculate()
+
+        bms = Power_Component(timestep=1,
+                              input_link=charger,
+                              file_path='data/components/battery_management.json',
+                              parameters=sim.parameters.get('battery_management'))
+        bms.calculate()
+
+        battery = Battery(timestep=1,
+                          input_link=bms,
+                          file_path='data/components/battery_lfp.json',
+                          parameters=sim.parameters.get('battery'))
+        battery.calculate()
+
+        # Sum of recuperated energy [Wh]
+        results_parameter['energy_recuperation'] = kpi.energy_recuperation
+        # Sum of BRUTTO energy consumption (without recuperation) [Wh]
+        results_parameter['energy_consumption'] = kpi.energy_consumption
+        # Sum of energy charged in charge phases [Wh]
+        results_parameter['energy_charge'] = kpi.energy_charge
+        # Sum of NETTO energy consumption [Wh]
+        results_parameter['energy'] = (results_parameter['energy_consumption'] - results_parameter['energy_recuperation']) \
+                                        / (charger.efficiency * bms.efficiency * battery.efficiency)
+        # Spesific energy per distance [Wh/m] or [kWh/km]
+        results_parameter['energy_per_km'] = results_parameter['energy'] / data_route['overall_distance']
+        # Specific energy per kg waste [Wh/kg] or [kWh/t]
+        results_parameter['energy_per_kg'] = results_parameter['energy'] / results_parameter['waste_mass']
+        # Peak C-rate [1/h]
+        results_parameter['battery_c_rate_max'] = kpi.battery_power_max / sim.battery.capacity_nominal_wh
+        # Minimum and final state of charge [1]
+        results_parameter['battery_soc_min'] = kpi.state_of_charge_min
+        results_parameter['battery_soc_end'] = kpi.state_of_charge_end
+        # Maximum battery temperature [K]
+        results_parameter['battery_temperature_max'] = kpi.temperature_max
+
+    elif sim.vehicle.specification =='vehicle_diesel':
+        ## Diesel
+        # Sum of recuperated energy [Wh]
+        results_parameter['energy_recuperation'] = 0
+        # Sum of BRUTTO energy consumption (without recuperation) [Wh]
+        results_parameter['energy_consumption'] = kpi.energy_diesel
+        # Sum of NETTO energy consumption [Wh]
+        results_parameter['energy'] = results_parameter['energy_consumption']
+        # Specific energy per distance [Wh/m] or [kWh/km]
+        results_parameter['energy_per_km'] = results_parameter['energy'] / data_route['overall_distance']
+        # Specific energy per kg waste [Wh/kg] or [kWh/t]
+        results_parameter['energy_per_kg'] = results_parameter['energy'] / results_parameter['waste_mass']
+        # Fuel consumption [l] with energy density of diesel [Wh/l]
+        results_parameter['fuel'] = results_parameter['energy'] / sim.vehicle.energy_density_fuel
+        # Specific fuel consumption [l/100km]
+        results_parameter['fuel_per_100km'] = results_parameter['fuel'] / data_route['overall_distance'] * 1e5
+        # CO2 emission [kg] with CO2 emission per litre diesel [kg/l]
+        results_parameter['co2'] = results_parameter['fuel'] * sim.vehicle.co2_emission_fuel
+        # Specific CO2 emission [kg/km]
+        results_parameter['co2_per_km'] = results_parameter['co2'] / data_route['overall_distance'] * 1000
+
+    else:
+        print('No vehicle type specified in json file')
+
+    return results_parameter
@@ -0,0 +1,166 @@
+import numpy as np
+import pandas as pd
+
+
+# Data type of raw events
+event_dtype = np.dtype([('component', 'U32'),
+                        ('event', 'U32'),
+                        ('level', 'U8'),
+                        ('time', np.int64),
+                        ('value', np.float64)])
+
+# Messages of component events
+event_messages = {'motor_overflow': 'vehicle engine in motor mode exceeds maximum engine power!',
+                  'generator_overflow': 'vehicle engine in generator mode exceeds maximum engine power!',
+                  'start': 'Start',
+                  'end': 'End'}
+
+
+class EventLog:
+    '''
+    Structured event log of simulation components, replaces per timestep messages
+    Events are aggregated per component and event (count, first/last timestep, peak value) and emitted once,
+    raw events are available as structured numpy array
+
+    Attributes
+    ----------
+    verbose : bool. Print aggregated warnings with emit
+    components, events, levels, times, values : lists. Raw events
+
+    Methods
+    -------
+    record
+    record_array
+    clear
+    get_events
+    get_summary
+    emit
+    '''
+
+    def __init__(self, verbose=True):
+        '''
+        Parameters
+        ----------
+        verbose : bool. Print aggregated warnings with emit
+        '''
+        self.verbose = verbose
+        self.clear()
+
+
+    def clear(self):
+        '''
+        Method removes all events
+
+        Parameters
+        ----------
+        None
+        '''
+        self.components = list()
+        self.events = list()
+        self.levels = list()
+        self.times = list()
+        self.values = list()
+
+
+    def record(self, component, event, time, value=np.nan, level='warning'):
+        '''
+        Method records one event
+
+        Parameters
+        ----------
+        component : str. Component name, e.g. vehicle
+        event : str. Event name, e.g. motor_overflow
+        time : int [s]. Simulation timestep
+        value : float. Event value, e.g. power overshoot [W]
+        level : str. warning or info
+        '''
+        self.components.append(component)
+        self.events.append(event)
+        self.levels.append(level)
+        self.times.append(time)
+        self.values.append(value)
+
+
+    def record_array(self, component, event, times, values, level='warning'):
+        '''
+        Method records events of several timesteps, e.g. of vectorized calculation
+
+        Parameters
+        ----------
+        component : str. Component name
+        event : str. Event name
+        times : array of int [s]. Simulation timesteps
+        values : array of float. Event values
+        level : str. warning or info
+        '''
+        self.components.extend([component] * len(times))
+        self.events.extend([event] * len(times))
+        self.levels.extend([level] * len(times))
+        self.times.extend(np.asarray(times).tolist())
+        self.values.extend(np.asarray(values, dtype=float).tolist())
+
+
+    def get_events(self):
+        '''
+        Method returns raw events as structured array with fields component, event, level, time and value
+
+        Parameters
+        ----------
+        None
+        '''
+        events = np.empty(len(self.times), dtype=event_dtype)
+        events['component'] = self.components
+        events['event'] = self.events
+        events['level'] = self.levels
+        events['time'] = self.times
+        events['value'] = self.values
+
+        return events
+
+
+    def get_summary(self):
+        '''
+        Method aggregates events per component and event
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: level, count, first and last timestep, peak value (maximum absolute value) per component and event
+        '''
+        events = pd.DataFrame(self.get_events())
+        columns = ['level', 'count', 'time_first', 'time_last', 'value_peak']
+        if events.empty:
+            return pd.DataFrame(columns=columns, index=pd.MultiIndex.from_arrays([[], []], names=['component', 'event']))
+
+        events['value_abs'] = events['value'].abs()
+        grouped = events.groupby(['component', 'event'], sort=False)
+        summary = grouped.agg(level=('level', 'first'),
+                              count=('time', 'size'),
+                              time_first=('time', 'min'),
+                              time_last=('time', 'max'))
+        # Value with maximum absolute value, NaN for events without value
+        summary['value_peak'] = [group['value'][group['value_abs'].idxmax()] if group['value_abs'].notna().any()
+                                 else np.nan for name, group in grouped]
+
+        return summary[columns]
+
+
+    def emit(self):
+        '''
+        Method prints one line per component warning (aggregated), if verbose
+
+        Parameters
+        ----------
+        None
+        '''
+        if not self.verbose or 'warning' not in self.levels:
+            return
+
+        summary = self.get_summary()
+        for (component, event), row in summary[summary['level'] == 'warning'].iterrows():
+            print(component + ': ' + event_messages.get(event, event)
+                  + ' (' + str(row['count']) + ' timesteps, ' + str(row['time_first']) + ' s to ' + str(row['time_last'])
+                  + ' s, peak ' + ('%.1f' % row['value_peak']) + ')')
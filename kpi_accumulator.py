@@ -0,0 +1,118 @@
+import numpy as np
+
+
+class KPIAccumulator:
+    '''
+    Running accumulators of evaluation parameters (KPIs), updated with simulation results of a whole route profile
+    or of consecutive chunks of it, so KPIs are available without keeping the time series
+    Energies are sums of power flows in [Wh], extrema are taken over all updates since last reset
+
+    Attributes
+    ----------
+    timestep : int [s]. Simulation timestep
+    timesteps : int [1]. Number of accumulated timesteps
+    energy_motor : float [Wh]. Energy of vehicle motor in motor mode
+    energy_loader : float [Wh]. Energy of vehicle loader
+    energy_diesel : float [Wh]. Diesel energy consumption
+    energy_recuperation : float [Wh]. Battery charge energy while operating (recuperation)
+    energy_charge : float [Wh]. Battery charge energy in charge phases (charger)
+    energy_consumption : float [Wh]. Battery discharge energy (without recuperation)
+    mass_max : float [kg]. Maximum cumulated vehicle mass
+    battery_power_max : float [W]. Maximum absolute battery power
+    state_of_charge_min : float [1]. Minimum battery state of charge
+    state_of_charge_end : float [1]. Battery state of charge of last timestep
+    temperature_max : float [K]. Maximum battery temperature
+
+    Methods
+    -------
+    reset
+    update
+    '''
+
+    def __init__(self, timestep=1):
+        '''
+        Parameters
+        ----------
+        timestep : int [s]. Simulation timestep
+        '''
+        self.timestep = timestep
+        self.reset()
+
+
+    def reset(self):
+        '''
+        Method resets all accumulators
+
+        Parameters
+        ----------
+        None
+        '''
+        self.timesteps = 0
+        ## Energy sums
+        self.energy_motor = 0.
+        self.energy_loader = 0.
+        self.energy_diesel = 0.
+        self.energy_recuperation = 0.
+        self.energy_charge = 0.
+        self.energy_consumption = 0.
+        ## Extrema
+        self.mass_max = -np.inf
+        self.battery_power_max = 0.
+        self.state_of_charge_min = np.inf
+        self.state_of_charge_end = np.nan
+        self.temperature_max = -np.inf
+
+
+    def update(self, results, profile=None, duration=None):
+        '''
+        Method updates accumulators with simulation results of consecutive timesteps or of consecutive segments
+        (power flows: mean of segment, states: last timestep of segment)
+
+        Parameters
+        ----------
+        results : Recorder or DataFrame. Simulation results with result columns of Simulation
+        profile : DataFrame. Route profile of same timesteps, to separate charge phases (phase_type 0)
+            from recuperation, None for route profiles without charge phases
+        duration : array of int [1]. Number of timesteps of each segment, None for results of single timesteps
+        '''
+        length = len(results['vehicle_mass_cum'])
+        if length == 0:
+            return
+
+        # [Ws] to [Wh]
+        steps_per_hour = 3600 / self.timestep
+
+        power_motor = np.asarray(results['vehicle_power_motor'])
+        power_loader = np.asarray(results['vehicle_power_loader'])
+        power_diesel = np.asarray(results['vehicle_power_diesel'])
+        power_battery = np.asarray(results['battery_power'])
+        state_of_charge = np.asarray(results['battery_state_of_charge'])
+
+        if duration is None:
+            self.timesteps += length
+            energy_motor, energy_loader, energy_diesel, energy_battery = \
+                power_motor, power_loader, power_diesel, power_battery
+        else:
+            # Segments: mean power * number of timesteps
+            duration = np.asarray(duration)
+            self.timesteps += int(duration.sum())
+            energy_motor, energy_loader, energy_diesel, energy_battery = \
+                power_motor * duration, power_loader * duration, power_diesel * duration, power_battery * duration
+
+        ## Energy sums
+        self.energy_motor += energy_motor[power_motor > 0].sum() / steps_per_hour
+        self.energy_loader += energy_loader[power_loader > 0].sum() / steps_per_hour
+        self.energy_diesel -= energy_diesel[power_diesel < 0].sum() / steps_per_hour
+        if profile is None:
+            self.energy_recuperation += energy_battery[power_battery > 0].sum() / steps_per_hour
+        else:
+            charging = (np.asarray(profile.phase_type) == 0)
+            self.energy_recuperation += energy_battery[(power_battery > 0) & ~charging].sum() / steps_per_hour
+            self.energy_charge += energy_battery[(power_battery > 0) & charging].sum() / steps_per_hour
+        self.energy_consumption -= energy_battery[power_battery < 0].sum() / steps_per_hour
+        ## Extrema
+        self.mass_max = max(self.mass_max, np.max(results['vehicle_mass_cum']))
+        self.battery_power_max = max(self.battery_power_max, np.max(np.abs(power_battery)))
+        self.state_of_charge_min = min(self.state_of_charge_min, np.min(state_of_charge))
+        self.state_of_charge_end = state_of_charge[length-1]
+        self.temperature_max = max(self.temperature_max, np.max(results['battery_temperature']))
@@ -0,0 +1,397 @@
+import argparse
+import copy
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+from statistics import NormalDist
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import profile_cache
+from simulation import Simulation
+from evaluation import get_results_parameter
+from batch import init_worker
+from sweep import get_component_parameters
+from stochastic_route import sample_distribution
+from components.serializable import Serializable
+
+
+# Component parameter files of uncertain parameters 'component.attribute', vehicle file is set by MonteCarlo
+parameter_files = {'route': 'data/components/route_profile.json',
+                   'battery_management': 'data/components/battery_management.json',
+                   'battery': 'data/components/battery_lfp.json'}
+
+# Default uncertain parameters: distribution and coefficient of variation, mean of json files or tour data
+# Battery parameters and KPIs are not used for diesel vehicles
+default_uncertainties = {'vehicle.cr': {'distribution': 'normal', 'cv': 0.1},
+                         'vehicle.cw': {'distribution': 'normal', 'cv': 0.1},
+                         'vehicle.efficiency_loader': {'distribution': 'normal', 'cv': 0.05},
+                         'tour.container_mass': {'distribution': 'normal', 'cv': 0.2},
+                         'battery.charge_power_efficiency_a': {'distribution': 'normal', 'cv': 0.1},
+                         'battery.discharge_power_efficiency_a': {'distribution': 'normal', 'cv': 0.1}}
+
+# Default confidence interval width targets of KPIs [KPI unit]
+default_target_width = {'energy_per_km': 0.01,
+                        'battery_soc_end': 0.001}
+
+
+class Welford:
+    '''
+    Running mean and variance of a KPI (Welford's algorithm), numerically stable for many samples
+
+    Attributes
+    ----------
+    count : int. Number of samples
+    mean : float. Running mean
+    m2 : float. Running sum of squared deviations from mean
+
+    Methods
+    -------
+    update
+    get_variance
+    get_confidence_width
+    '''
+
+    def __init__(self):
+        '''
+        Parameters
+        ----------
+        None
+        '''
+        self.count = 0
+        self.mean = 0.
+        self.m2 = 0.
+
+
+    def update(self, values):
+        '''
+        Method updates mean and variance with samples, NaN samples are skipped
+
+        Parameters
+        ----------
+        values : array. KPI values of samples
+        '''
+        for value in np.asarray(values, dtype=float):
+            if math.isnan(value):
+                continue
+            self.count += 1
+            delta = value - self.mean
+            self.mean += delta / self.count
+            self.m2 += delta * (value - self.mean)
+
+
+    def get_variance(self):
+        '''
+        Method returns sample variance, NaN for less than two samples
+
+        Parameters
+        ----------
+        None
+        '''
+        return self.m2 / (self.count - 1) if self.count > 1 else np.nan
+
+
+    def get_confidence_width(self, confidence=0.95):
+        '''
+        Method returns width of confidence interval of mean (normal approximation), inf for less than two samples
+
+        Parameters
+        ----------
+        confidence : float [1]. Confidence level
+        '''
+        if self.count < 2:
+            return np.inf
+
+        return 2 * NormalDist().inv_cdf((1 + confidence) / 2) * math.sqrt(self.get_variance() / self.count)
+
+
+def simulate_samples(task):
+    '''
+    Simulates Monte Carlo samples of one task
+    Route profile of nominal tour is synthesized once (profile cache), samples with other container mass use a copy
+    with scaled container mass, as container mass enters the route profile linearly. Samples with other tour data
+    or route parameters are synthesized again
+
+    Parameters
+    ----------
+    task: tuple. (data_route, vehicle_file, [(index, sample), ...])
+
+    Returns
+    -------
+    list of dicts: sample index, sampled parameters and evaluation parameters
+    '''
+    data_route, vehicle_file, samples = task
+
+    results = list()
+    route_nominal = None
+    for index, sample in samples:
+        parameters = get_component_parameters({name: value for name, value in sample.items()
+                                               if not name.startswith('tour.')})
+        tour = {name.split('.', 1)[1]: value for name, value in sample.items() if name.startswith('tour.')}
+
+        # Route with sampled container mass, neither route parameters nor other tour data are sampled
+        route = None
+        tour_synthesis = [name for name, value in tour.items()
+                          if name != 'container_mass' and value != data_route[name]]
+        if not parameters['route'] and not tour_synthesis:
+            if route_nominal is None:
+                route_nominal = Simulation(data_route, vehicle_file=vehicle_file,
+                                           profile_cache=profile_cache.default_cache).route
+            route = copy.copy(route_nominal)
+            route.data_route = dict(data_route, **tour)
+            if route.data_route['container_mass'] != data_route['container_mass']:
+                route.profile_day = route_nominal.profile_day.copy()
+                route.profile_day['container_mass'] *= route.data_route['container_mass'] / data_route['container_mass']
+
+        sim = Simulation(dict(data_route, **tour), vehicle_file=vehicle_file, parameters=parameters, route=route,
+                         profile_cache=profile_cache.default_cache)
+        sim.simulate_vectorized()
+
+        results_parameter = {'sample': index}
+        results_parameter.update(sample)
+        results_parameter.update(get_results_parameter(sim))
+        results.append(results_parameter)
+
+    return results
+
+
+class MonteCarlo:
+    '''
+    Monte Carlo simulation over uncertain component parameters and tour data
+    Samples are simulated in batches distributed over worker processes, running mean and variance of KPIs are
+    updated with Welford accumulators after each batch. Sampling stops as soon as the confidence interval widths
+    of all KPIs are below their targets (or at max_samples)
+
+    Attributes
+    ----------
+    data_route: dict. Route parameters (see Simulation)
+    uncertainties: dict. {'component.attribute': distribution (see stochastic_route.sample_distribution)},
+        components route, vehicle, battery_management, battery or tour (tour data, e.g. tour.container_mass,
+        tour.distance_collection), mean is value of json file or tour data if not given
+    target_width: dict. {KPI: confidence interval width}, KPIs of evaluation.get_results_parameter
+    confidence: float [1]. Confidence level
+    vehicle_file: json file. Vehicle parameter file
+    batch_size: int. Number of samples per batch
+    min_samples, max_samples: int. Minimum and maximum number of samples
+    max_workers: int. Number of worker processes, None for number of CPUs, 1 to simulate in current process
+    rng: numpy Generator. Random number generator
+    statistics: dict. {KPI: Welford}
+
+    Methods
+    -------
+    get_means
+    sample
+    get_tasks
+    converged
+    simulate
+    get_summary
+    '''
+
+    def __init__(self, data_route, uncertainties=None, target_width=None, confidence=0.95,
+                 vehicle_file='data/components/vehicle_electric.json', batch_size=None,
+                 min_samples=100, max_samples=10000, max_workers=None, seed=None):
+        '''
+        Parameters
+        ----------
+        data_route: dict. Route parameters (see Simulation)
+        uncertainties: dict. Uncertain parameters and distributions, None for default_uncertainties (of vehicle)
+        target_width: dict. Confidence interval width targets, None for default_target_width (of vehicle)
+        confidence: float [1]. Confidence level
+        vehicle_file: json file. Vehicle parameter file
+        batch_size: int. Number of samples per batch, None for 16 samples per worker
+        min_samples: int. Minimum number of samples
+        max_samples: int. Maximum number of samples
+        max_workers: int. Number of worker processes
+        seed: int. Seed of random number generator
+        '''
+        # Diesel vehicle: electric chain is not simulated, default battery parameters and KPIs are skipped
+        vehicle = Serializable()
+        vehicle.load(vehicle_file)
+        electric = vehicle.specification != 'vehicle_diesel'
+        if uncertainties is None:
+            uncertainties = {name: distribution for name, distribution in default_uncertainties.items()
+                             if electric or not name.startswith('battery.')}
+        if target_width is None:
+            target_width = {kpi: width for kpi, width in default_target_width.items()
+                            if electric or not kpi.startswith('battery_')}
+
+        self.data_route = data_route
+        self.uncertainties = dict(uncertainties)
+        self.target_width = dict(target_width)
+        self.confidence = confidence
+        self.vehicle_file = vehicle_file
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+        self.batch_size = batch_size if batch_size else 16 * self.max_workers
+        self.min_samples = min_samples
+        self.max_samples = max_samples
+        self.rng = np.random.default_rng(seed)
+        self.statistics = {kpi: Welford() for kpi in self.target_width}
+
+
+    def get_means(self):
+        '''
+        Method returns mean values of uncertain parameters: given mean, value of json file or tour data
+
+        Parameters
+        ----------
+        None
+        '''
+        files = dict(parameter_files, vehicle=self.vehicle_file)
+        means = dict()
+        for name, distribution in self.uncertainties.items():
+            component, attribute = name.split('.', 1)
+            if 'mean' in distribution:
+                means[name] = distribution['mean']
+            elif component == 'tour':
+                if attribute not in self.data_route:
+                    raise ValueError('Unknown tour data in uncertain parameter ' + name)
+                means[name] = self.data_route[attribute]
+            elif component in files:
+                parameters = Serializable()
+                parameters.load(files[component])
+                means[name] = getattr(parameters, attribute)
+            else:
+                raise ValueError('Unknown component in uncertain parameter ' + name)
+
+        return means
+
+
+    def sample(self, samples):
+        '''
+        Method samples uncertain parameters
+
+        Parameters
+        ----------
+        samples: int. Number of samples
+
+        Returns
+        -------
+        list of dicts: sampled parameters {'component.attribute': value}
+        '''
+        means = self.get_means()
+        values = {name: sample_distribution(self.rng, distribution, means[name], samples)
+                  for name, distribution in self.uncertainties.items()}
+
+        return [{name: float(values[name][i]) for name in values} for i in range(samples)]
+
+
+    def get_tasks(self, samples, start=0):
+        '''
+        Method splits samples into one task per worker
+
+        Parameters
+        ----------
+        samples: list of dicts. Sampled parameters
+        start: int. Index of first sample
+        '''
+        chunksize = max(1, math.ceil(len(samples) / self.max_workers))
+        indexed_samples = list(enumerate(samples, start))
+
+        return [(self.data_route, self.vehicle_file, indexed_samples[i:i+chunksize])
+                for i in range(0, len(indexed_samples), chunksize)]
+
+
+    def converged(self):
+        '''
+        Method returns True, if confidence interval widths of all KPIs are below their targets
+
+        Parameters
+        ----------
+        None
+        '''
+        return all(self.statistics[kpi].get_confidence_width(self.confidence) <= width
+                   for kpi, width in self.target_width.items())
+
+
+    def simulate(self):
+        '''
+        Method simulates batches of samples until convergence (at least min_samples) or max_samples
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: one row per sample with sampled parameters and evaluation parameters
+        '''
+        self.statistics = {kpi: Welford() for kpi in self.target_width}
+        results = list()
+
+        # Route profile cache and drive cycle store settings of current process are used by worker processes
+        initargs = ([self.vehicle_file], profile_cache.default_cache.directory, data_loader.drivecycle_store.persist)
+        executor = None
+        if self.max_workers == 1:
+            init_worker(*initargs)
+        else:
+            executor = ProcessPoolExecutor(max_workers=self.max_workers,
+                                           initializer=init_worker,
+                                           initargs=initargs)
+
+        try:
+            while len(results) < self.max_samples:
+                tasks = self.get_tasks(self.sample(min(self.batch_size, self.max_samples - len(results))),
+                                       start=len(results))
+                if executor is None:
+                    batch = [result for task in tasks for result in simulate_samples(task)]
+                else:
+                    batch = [result for results_task in executor.map(simulate_samples, tasks)
+                             for result in results_task]
+
+                # KPIs not evaluated for vehicle would never converge
+                missing = [kpi for kpi in self.target_width if not any(kpi in result for result in batch)]
+                if missing:
+                    raise ValueError('Target KPIs ' + ', '.join(missing) + ' are not evaluated for vehicle '
+                                     + self.vehicle_file)
+
+                # Accumulators are updated in sample order, independent of number of workers
+                for kpi, statistics in self.statistics.items():
+                    statistics.update([result.get(kpi, np.nan) for result in batch])
+                results.extend(batch)
+
+                if len(results) >= self.min_samples and self.converged():
+                    break
+        finally:
+            if executor is not None:
+                executor.shutdown()
+
+        return pd.DataFrame(results).set_index('sample')
+
+
+    def get_summary(self):
+        '''
+        Method returns running statistics of all KPIs
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: samples, mean, standard deviation, confidence interval width and target width per KPI
+        '''
+        return pd.DataFrame({kpi: {'samples': statistics.count,
+                                   'mean': statistics.mean,
+                                   'std': math.sqrt(statistics.get_variance()) if statistics.count > 1 else np.nan,
+                                   'confidence_width': statistics.get_confidence_width(self.confidence),
+                                   'target_width': self.target_width[kpi],
+                                   'converged': statistics.get_confidence_width(self.confidence)
+                                                <= self.target_width[kpi]}
+                             for kpi, statistics in self.statistics.items()}).T
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Monte Carlo simulation over uncertain parameters')
+    parser.add_argument('--tour', default='data/load/tour.pkl', help='Pickled route parameters')
+    parser.add_argument('--vehicle', default='data/components/vehicle_electric.json')
+    parser.add_argument('--max-samples', type=int, default=10000)
+    parser.add_argument('--workers', type=int, default=None)
+    parser.add_argument('--seed', type=int, default=None)
+    arguments = parser.parse_args()
+
+    monte_carlo = MonteCarlo(pd.read_pickle(arguments.tour), vehicle_file=arguments.vehicle,
+                             max_samples=arguments.max_samples, max_workers=arguments.workers, seed=arguments.seed)
+    results = monte_carlo.simulate()
+    print(monte_carlo.get_summary())
@@ -0,0 +1,148 @@
+import hashlib
+import json
+import os
+from collections import OrderedDict
+
+import pandas as pd
+
+from compact_profile import CompactProfile
+
+
+class ProfileCache:
+    '''
+    Content addressed cache for synthesized route profiles
+    Profiles are identified by tour data, route parameters (json contents incl. overriding parameters),
+    timestep and drive cycle file. Cache is kept in memory (least recently used) and optionally on disk,
+    profiles are stored as DataFrames or as CompactProfiles (compact=True, several times less memory)
+
+    Attributes
+    ----------
+    max_size : int. Maximum number of profiles kept in memory
+    directory : str. Directory of on-disk store, None for memory only
+    compact : bool. Store and return profiles as CompactProfile
+    hits : int. Number of profiles taken from memory
+    disk_hits : int. Number of profiles taken from disk store
+    misses : int. Number of synthesized profiles
+
+    Methods
+    -------
+    get_key
+    get_profile
+    clear
+    get_stats
+    '''
+
+    def __init__(self, max_size=128, directory=None, compact=False):
+        '''
+        Parameters
+        ----------
+        max_size : int. Maximum number of profiles kept in memory
+        directory : str. Directory of on-disk store, None for memory only
+        compact : bool. Store and return profiles as CompactProfile
+        '''
+        self.max_size = max_size
+        self.directory = directory
+        self.compact = compact
+        self.profiles = OrderedDict()
+
+        ## Counters
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+
+    def get_key(self, route):
+        '''
+        Method returns content hash of all route synthesis inputs
+
+        Parameters
+        ----------
+        route : Route. Route instance before profile synthesis
+        '''
+        content = {'data_route': route.data_route,
+                   'route_parameters': route.route_parameters,
+                   'timestep': route.timestep,
+                   'drivecycle_modification_time': os.path.getmtime(route.drivecycle_file)}
+
+        # Numpy scalars of tour data are converted with float
+        return hashlib.sha256(json.dumps(content, sort_keys=True, default=float).encode()).hexdigest()
+
+
+    def get_profile(self, route):
+        '''
+        Method returns route profile from memory, disk store or by route synthesis (route.get_profile)
+        Returned profile is shared between all users of the cache and must not be modified
+
+        Parameters
+        ----------
+        route : Route. Route instance before profile synthesis
+        '''
+        key = self.get_key(route)
+
+        # Memory
+        if key in self.profiles:
+            self.hits += 1
+            self.profiles.move_to_end(key)
+            return self.profiles[key]
+
+        # Disk store
+        file_name = os.path.join(self.directory, key + '.pkl') if self.directory else None
+        if file_name and os.path.exists(file_name):
+            self.disk_hits += 1
+            profile_day = pd.read_pickle(file_name)
+
+        # Route synthesis
+        else:
+            self.misses += 1
+            route.get_profile()
+            profile_day = CompactProfile(route.profile_day) if self.compact else route.profile_day
+            if file_name:
+                os.makedirs(self.directory, exist_ok=True)
+                # Write to temporary file first, so parallel processes never read incomplete files
+                file_name_temporary = file_name + '.' + str(os.getpid())
+                pd.to_pickle(profile_day, file_name_temporary)
+                os.replace(file_name_temporary, file_name)
+
+        # Disk store may contain profiles of caches with other representation
+        if self.compact and not isinstance(profile_day, CompactProfile):
+            profile_day = CompactProfile(profile_day)
+        elif not self.compact and isinstance(profile_day, CompactProfile):
+            profile_day = profile_day.to_dataframe()
+
+        self.profiles[key] = profile_day
+        if len(self.profiles) > self.max_size:
+            self.profiles.popitem(last=False)
+
+        return profile_day
+
+
+    def clear(self):
+        '''
+        Method removes all profiles from memory and resets counters, disk store is kept
+
+        Parameters
+        ----------
+        None
+        '''
+        self.profiles.clear()
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+
+
+    def get_stats(self):
+        '''
+        Method returns cache counters
+
+        Parameters
+        ----------
+        None
+        '''
+        return {'hits': self.hits,
+                'disk_hits': self.disk_hits,
+                'misses': self.misses,
+                'size': len(self.profiles)}
+
+
+# Default cache of current process, used by batch simulations and sweeps
+default_cache = ProfileCache()
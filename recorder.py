@@ -0,0 +1,82 @@
+import numpy as np
+import pandas as pd
+
+
+class Recorder:
+    '''
+    Result recorder, to store simulation results in preallocated columns
+    All columns are stored in one 2D numpy array, each column is a contiguous row of this array
+
+    Attributes
+    ----------
+    columns : list of str. Names of result columns
+    length : int. Number of simulation timesteps
+    dtype : numpy dtype. Data type of result columns
+
+    Methods
+    -------
+    record
+    to_dataframe
+    '''
+
+    def __init__(self, columns, length, dtype=np.float64):
+        '''
+        Parameters
+        ----------
+        columns : list of str. Names of result columns
+        length : int. Number of simulation timesteps
+        dtype : numpy dtype. Data type of result columns
+        '''
+        self.columns = list(columns)
+        self.length = length
+        # Column index for fast access
+        self.column_index = {column: i for i, column in enumerate(self.columns)}
+        # Preallocated result array [column, timestep]
+        self.data = np.zeros((len(self.columns), self.length), dtype=dtype)
+
+
+    def __getitem__(self, column):
+        '''
+        Returns view of result column
+
+        Parameters
+        ----------
+        column : str. Name of result column
+        '''
+        return self.data[self.column_index[column]]
+
+
+    def __setitem__(self, column, values):
+        '''
+        Writes whole result column
+
+        Parameters
+        ----------
+        column : str. Name of result column
+        values : array. Values of whole column
+        '''
+        self.data[self.column_index[column]] = values
+
+
+    def record(self, t, values, start=0):
+        '''
+        Method writes the values of all columns (or of consecutive columns from column index start) for one timestep
+
+        Parameters
+        ----------
+        t : int. Timestep index
+        values : tuple. Values in order of columns
+        start : int. Column index of first value
+        '''
+        self.data[start:start+len(values), t] = values
+
+
+    def to_dataframe(self, index=None):
+        '''
+        Method returns DataFrame of all result columns, which shares memory with the recorder (no copy)
+
+        Parameters
+        ----------
+        index : array. Optional index of DataFrame
+        '''
+        return pd.DataFrame(self.data.T, columns=self.columns, index=index, copy=False)
@@ -0,0 +1,186 @@
+import glob
+import os
+
+import numpy as np
+import pandas as pd
+
+from evaluation import parameter_names
+
+# Optional columnar file formats parquet/feather
+try:
+    import pyarrow
+except ImportError:
+    pyarrow = None
+
+
+class ResultWriter:
+    '''
+    Result writer for columnar, compressed storage of simulation results
+    Power flows are partitioned by vehicle specification and tour:
+        <directory>/power_flows/specification=<specification>/tour=<tour>.<parquet/feather/npz>
+    Evaluation parameters of all tours are appended to one table <directory>/parameter.csv with the evaluation
+    parameters of all vehicle specifications as columns (evaluation.parameter_names)
+
+    Attributes
+    ----------
+    directory : str. Result directory
+    file_format : str. parquet, feather (both need pyarrow) or npz (compressed numpy archive)
+
+    Methods
+    -------
+    get_file_name
+    write_powerflows
+    write_parameter
+    read_powerflows
+    read_column
+    read_parameter
+    '''
+
+    def __init__(self, directory='results', file_format=None):
+        '''
+        Parameters
+        ----------
+        directory : str. Result directory
+        file_format : str. parquet, feather or npz, None for parquet if pyarrow is installed otherwise npz
+        '''
+        if file_format is None:
+            file_format = 'parquet' if pyarrow is not None else 'npz'
+
+        if file_format in ['parquet', 'feather'] and pyarrow is None:
+            raise ImportError('File format ' + file_format + ' needs package pyarrow, use file_format npz instead')
+
+        self.directory = directory
+        self.file_format = file_format
+
+
+    def get_file_name(self, specification, tour):
+        '''
+        Method returns file name of power flow partition
+
+        Parameters
+        ----------
+        specification : str. Vehicle specification
+        tour : str. Tour id
+        '''
+        return os.path.join(self.directory, 'power_flows', 'specification=' + str(specification),
+                            'tour=' + str(tour) + '.' + self.file_format)
+
+
+    def write_powerflows(self, results_powerflows, specification, tour):
+        '''
+        Method writes power flows of one tour (see evaluation.get_results_powerflows)
+
+        Parameters
+        ----------
+        results_powerflows : DataFrame. Power flows of all timesteps with Datetimeindex
+        specification : str. Vehicle specification
+        tour : str. Tour id
+        '''
+        file_name = self.get_file_name(specification, tour)
+        os.makedirs(os.path.dirname(file_name), exist_ok=True)
+
+        if self.file_format == 'parquet':
+            results_powerflows.to_parquet(file_name, compression='zstd')
+
+        elif self.file_format == 'feather':
+            results_powerflows.reset_index().to_feather(file_name, compression='zstd')
+
+        else:
+            # One compressed array per column, index stored as int64 [ns]
+            np.savez_compressed(file_name,
+                                __index__=results_powerflows.index.values.astype('datetime64[ns]').astype(np.int64),
+                                **{column: results_powerflows[column].to_numpy() for column in results_powerflows})
+
+
+    def write_parameter(self, results_parameter, specification, tour):
+        '''
+        Method appends evaluation parameters of one tour to parameter table, parameters not evaluated for the vehicle
+        specification are empty
+
+        Parameters
+        ----------
+        results_parameter : dict. Evaluation parameters (see evaluation.get_results_parameter)
+        specification : str. Vehicle specification
+        tour : str. Tour id
+        '''
+        file_name = os.path.join(self.directory, 'parameter.csv')
+        os.makedirs(self.directory, exist_ok=True)
+
+        columns = ['tour', 'specification'] + parameter_names
+        unknown = [name for name in results_parameter if name not in parameter_names]
+        if unknown:
+            raise ValueError('Unknown evaluation parameters ' + ', '.join(unknown) + ' of tour ' + str(tour))
+
+        # Rows are appended, header is written for new table only
+        exists = os.path.exists(file_name)
+        if exists and list(pd.read_csv(file_name, nrows=0).columns) != columns:
+            raise ValueError('Parameter table ' + file_name + ' has other columns, use another result directory')
+
+        row = {'tour': tour, 'specification': specification}
+        row.update(results_parameter)
+        pd.DataFrame([row], columns=columns).to_csv(file_name, mode='a', header=not exists, index=False)
+
+
+    def read_powerflows(self, specification, tour, columns=None):
+        '''
+        Method reads power flows of one tour
+
+        Parameters
+        ----------
+        specification : str. Vehicle specification
+        tour : str. Tour id
+        columns : list of str. Columns to read, None for all columns
+        '''
+        file_name = self.get_file_name(specification, tour)
+
+        if self.file_format == 'parquet':
+            return pd.read_parquet(file_name, columns=columns)
+
+        elif self.file_format == 'feather':
+            return pd.read_feather(file_name, columns=(['date'] + list(columns)) if columns else None).set_index('date')
+
+        else:
+            # Only requested columns are decompressed
+            with np.load(file_name) as data:
+                columns = columns if columns else [column for column in data.files if column != '__index__']
+                return pd.DataFrame({column: data[column] for column in columns},
+                                    index=pd.DatetimeIndex(data['__index__'].astype('datetime64[ns]'), name='date'))
+
+
+    def read_column(self, column, specification=None):
+        '''
+        Method reads one power flow column of all tours, without loading other columns
+
+        Parameters
+        ----------
+        column : str. Power flow column e.g. battery_soc
+        specification : str. Vehicle specification, None for all specifications
+
+        Returns
+        -------
+        dict: {(specification, tour): Series}
+        '''
+        pattern = self.get_file_name(specification if specification else '*', '*')
+
+        results = dict()
+        for file_name in sorted(glob.glob(pattern)):
+            partition_specification = os.path.basename(os.path.dirname(file_name))[len('specification='):]
+            partition_tour = os.path.splitext(os.path.basename(file_name))[0][len('tour='):]
+            results[(partition_specification, partition_tour)] = \
+                self.read_powerflows(partition_specification, partition_tour, columns=[column])[column]
+
+        return results
+
+
+    def read_parameter(self):
+        '''
+        Method reads evaluation parameters of all tours, of repeatedly written tours (e.g. repeated runs) only the
+        last written row
+
+        Parameters
+        ----------
+        None
+        '''
+        parameter = pd.read_csv(os.path.join(self.directory, 'parameter.csv'))
+
+        return parameter.drop_duplicates(['tour', 'specification'], keep='last').reset_index(drop=True)
@@ -1,6 +1,14 @@
 from datetime import datetime
 
+import numpy as np
+import pandas as pd
+
 from components.simulatable import Simulatable
+from components.component_graph import ComponentGraph
+from recorder import Recorder
+from kpi_accumulator import KPIAccumulator
+from event_log import EventLog
+from compact_profile import CompactProfile
 
 from components.route import Route
 from components.vehicle import Vehicle
@@ -20,12 +28,63 @@ class Simulation(Simulatable):
     Methods
     -------
     simulate
+    simulate_vectorized
+    simulate_stream
+    simulate_adaptive
+    merge_segments
+    reset_state
+    calculate_vectorized
+    calculate_battery
+    get_input_power
+    write_battery
+    clear_electric_results
+    simulate_battery
+    set_battery_parameters
+    add_component
+    record_start
+    record_end
+    get_profiling_summary
+    link_results
     '''
 
-    def __init__(self, data_route):
+    # Simulation result columns stored in result recorder
+    result_columns = [# Vehicle
+                      'vehicle_mass_cum',
+                      'vehicle_power_drive',
+                      'vehicle_power_loader',
+                      'vehicle_power_motor',
+                      'vehicle_power_electric',
+                      'vehicle_power_diesel',
+                      'vehicle_efficiency_drivetrain',
+                      # BMS
+                      'battery_management_power',
+                      'battery_management_efficiency',
+                      # Battery
+                      'battery_power',
+                      'battery_efficiency',
+                      'battery_power_loss',
+                      'battery_state_of_charge',
+                      'battery_temperature']
+
+    # Components of electric drivetrain chain, not simulated for diesel vehicles
+    electric_components = ['battery_management', 'battery']
+
+    # Output power result column of components, added components are recorded as <name>_power
+    power_columns = {'vehicle': 'vehicle_power_electric',
+                     'battery_management': 'battery_management_power',
+                     'battery': 'battery_power'}
+
+
+    def __init__(self, data_route, vehicle_file='data/components/vehicle_electric.json', parameters=None, route=None,
+                 profile_cache=None):
         '''
         Parameters
         ----------
+        vehicle_file: json file. Vehicle parameter load file, defines vehicle specification (electric/diesel)
+        parameters: dict. Component parameters overriding values of json files, e.g.
+            {'route': {...}, 'vehicle': {...}, 'battery_management': {...}, 'battery': {'capacity_nominal_wh': 250000.}}
+        route: Route. Already synthesized route with same data_route and route parameters, route synthesis is skipped
+        profile_cache: ProfileCache. Cache of synthesized route profiles, route synthesis is skipped for cached profiles
         data_route: dict - route profile parameter:
             container_mass: float [kg].     Mass of container
             containers_sum: int [1].        Number of containers of collection route
@@ -40,97 +99,623 @@ class Simulation(Simulatable):
         # [s] Simulation timestep
         self.timestep = 1
 
+        # Component parameters overriding json files
+        self.parameters = {component: dict(component_parameters)
+                           for component, component_parameters in (parameters or {}).items()}
+
         ## Create route profile
-        self.route = Route(timestep=self.timestep,
-                           data_route=data_route,
-                           file_path='data/components/route_profile.json' )
-        self.route.get_profile()
+        if route is not None:
+            self.route = route
+        else:
+            self.route = Route(timestep=self.timestep,
+                               data_route=data_route,
+                               file_path='data/components/route_profile.json',
+                               parameters=self.parameters.get('route'))
+            if profile_cache is not None:
+                self.route.profile_day = profile_cache.get_profile(self.route)
+            else:
+                self.route.get_profile()
 
         ## Initialize system component classes
         # Vehicle
         self.vehicle = Vehicle(timestep=self.timestep,
                                input_link=self.route.profile_day,
-                               file_path='data/components/vehicle_electric.json')
+                               file_path=vehicle_file,
+                               parameters=self.parameters.get('vehicle'))
 
         # Battery Management System
         self.battery_management = Power_Component(timestep=self.timestep,
                                                   input_link=self.vehicle,
-                                                  file_path='data/components/battery_management.json')
+                                                  file_path='data/components/battery_management.json',
+                                                  parameters=self.parameters.get('battery_management'))
         # Battery
         self.battery = Battery(timestep=self.timestep,
                                input_link=self.battery_management,
-                               file_path='data/components/battery_lfp.json')
+                               file_path='data/components/battery_lfp.json',
+                               parameters=self.parameters.get('battery'))
 
-        ## Initialize Simulatable class and define needs_update initially to True
-        Simulatable.__init__(self, self.vehicle, self.battery_management, self.battery)
+        ## Component graph: components with names of components supplying their input power
+        self.graph = ComponentGraph()
+        self.graph.add('vehicle', self.vehicle)
+        self.graph.add('battery_management', self.battery_management, inputs=['vehicle'])
+        self.graph.add('battery', self.battery, inputs=['battery_management'])
+
+        # Diesel vehicle: electric chain is skipped, vehicle supplies no electric power
+        self.components_skipped = list(self.electric_components) if self.vehicle.specification == 'vehicle_diesel' \
+                                  else []
+        # Components added with add_component, recorded after result columns of class
+        self.components_added = list()
+
+        ## Running evaluation parameters (KPIs) of simulated timesteps
+        self.kpi = KPIAccumulator(timestep=self.timestep)
+
+        ## Initialize Simulatable class with components in topological order and define needs_update initially to True
+        Simulatable.__init__(self, *self.graph.get_components(exclude=self.components_skipped))
+
+        ## Event log shared by all components, aggregated warnings are emitted once at the end of a simulation
+        self.event_log = EventLog()
+        for child in self.childs:
+            child.event_log = self.event_log
 
         self.needs_update = True
 
 
-    def simulate(self):
+    def simulate(self, chunk_size=3600):
         '''
         Central simulation method, which :
-            initializes all list containers to store simulation results
+            initializes result recorder with preallocated columns to store simulation results
             iterates over all simulation timesteps and calls Simulatable.start/update/end()
+            updates evaluation parameters in self.kpi after each chunk of timesteps
 
         Parameters
         ----------
-        None
+        chunk_size: int [s]. Number of timesteps per update of evaluation parameters
         '''
-        ## Initialization of list containers to store simulation results
-
-        # Timeindex
-        self.timeindex = list()
-
-        # Vehicle
-        self.vehicle_mass_cum = list()
-        self.vehicle_power_drive = list()
-        self.vehicle_power_loader = list()
-        self.vehicle_power_motor = list()
-        self.vehicle_power_electric = list()
-        self.vehicle_power_diesel = list()
-        self.vehicle_efficiency_drivetrain = list()
-        # BMS
-        self.battery_management_power = list()
-        self.battery_management_efficiency = list()
-        # Battery
-        self.battery_power = list()
-        self.battery_efficiency = list()
-        self.battery_power_loss = list()
-        self.battery_state_of_charge = list()
-        self.battery_temperature = list()
-
         # As long as needs_update = True simulation takes place
         if self.needs_update:
-            print(datetime.today().strftime('%Y-%m-%d %H:%M:%S'), ' Start')
+            self.record_start()
+            self.reset_state()
+
+            ## Initialization of result recorder to store simulation results
+            self.results = Recorder(columns=self.result_columns,
+                                    length=len(self.route.profile_day))
+            self.kpi.reset()
 
             ## Call start method (inheret from Simulatable) to start simulation
             self.start()
 
+            # Diesel: electric chain is not simulated and not recorded
+            electric = not self.components_skipped
+            electric_start = self.results.column_index['battery_management_power']
+            if not electric:
+                self.clear_electric_results(self.results)
+            # Added components, which are simulated
+            components_added = [(self.results.column_index[self.power_columns[name]], self.graph.components[name])
+                                for name in self.components_added if name not in self.components_skipped]
+            length = len(self.route.profile_day)
+            chunk_start = 0
+
+            # Compact route profile is expanded once, vehicle reads single timesteps
+            if isinstance(self.vehicle.input_link, CompactProfile):
+                self.vehicle.input_link = self.vehicle.input_link.to_dataframe()
+
             ## Iteration over all simulation steps
-            for t in range(0, len(self.route.profile_day)):#self.simulation_period_hours):
+            for t in range(0, length):#self.simulation_period_hours):
                 ## Call update method to call calculation method and go one simulation step further
                 self.update()
 
-                # Vehicle
-                self.vehicle_mass_cum.append(self.vehicle.mass_cum)
-                self.vehicle_power_drive.append(self.vehicle.power_drive)
-                self.vehicle_power_loader.append(self.vehicle.power_loader_motor)
-                self.vehicle_power_motor.append(self.vehicle.power_motor)
-                self.vehicle_power_electric.append(self.vehicle.power_electric)
-                self.vehicle_power_diesel.append(self.vehicle.power_diesel)
-                self.vehicle_efficiency_drivetrain.append(self.vehicle.eta_drivetrain)
-                # BMS
-                self.battery_management_power.append(self.battery_management.power)
-                self.battery_management_efficiency.append(self.battery_management.efficiency)
-                # Battery
-                self.battery_power.append(self.battery.power_battery)
-                self.battery_efficiency.append(self.battery.efficiency)
-                self.battery_power_loss.append(self.battery.power_loss)
-                self.battery_state_of_charge.append(self.battery.state_of_charge)
-                self.battery_temperature.append(self.battery.temperature)
+                # Write results of timestep in order of result_columns
+                self.results.record(t, (# Vehicle
+                                        self.vehicle.mass_cum,
+                                        self.vehicle.power_drive,
+                                        self.vehicle.power_loader_motor,
+                                        self.vehicle.power_motor,
+                                        self.vehicle.power_electric,
+                                        self.vehicle.power_diesel,
+                                        self.vehicle.eta_drivetrain))
+                if electric:
+                    self.results.record(t, (# BMS
+                                            self.battery_management.power,
+                                            self.battery_management.efficiency,
+                                            # Battery
+                                            self.battery.power_battery,
+                                            self.battery.efficiency,
+                                            self.battery.power_loss,
+                                            self.battery.state_of_charge,
+                                            self.battery.temperature),
+                                        start=electric_start)
+                for column, component in components_added:
+                    self.results.record(t, (component.power,), start=column)
+
+                # Evaluation parameters of completed chunk
+                if t + 1 - chunk_start == chunk_size or t + 1 == length:
+                    self.kpi.update({column: self.results[column][chunk_start:t+1] for column in self.result_columns},
+                                    self.route.profile_day[chunk_start:t+1])
+                    chunk_start = t + 1
+
+            self.link_results()
 
             ## Simulation over: set needs_update to false and call end method
             self.needs_update = False
-            print(datetime.today().strftime('%Y-%m-%d %H:%M:%S'), ' End')
-            self.end()
\ No newline at end of file
+            self.record_end(self.results.length)
+            self.end()
+
+            # Profiling summary, only if enabled with enable_profiling
+            if self.profiling is not None:
+                print(self.get_profiling_summary())
+
+
+    def simulate_vectorized(self):
+        '''
+        Vectorized simulation method, which calculates the whole route profile at once:
+            vehicle and battery management are evaluated as arrays
+            battery is evaluated with sequential battery kernel
+        Stores the same simulation results as simulate
+
+        Parameters
+        ----------
+        None
+        '''
+        # As long as needs_update = True simulation takes place
+        if self.needs_update:
+            self.record_start()
+            self.reset_state()
+            self.start()
+
+            self.kpi.reset()
+            self.results = self.calculate_vectorized(self.route.profile_day)
+            self.link_results()
+
+            ## Simulation over: set needs_update to false
+            self.needs_update = False
+            self.record_end(self.results.length)
+
+
+    def simulate_stream(self, sink=None, chunk_size=3600, profiles=None, reset=True):
+        '''
+        Streaming simulation method for long horizons (e.g. multi-day/multi-week operation):
+        route profiles are calculated with the vectorized models in chunks of fixed size and each chunk is passed to sink
+        Component states (vehicle mass, battery state of charge/temperature) are carried across chunk boundaries and
+        route profiles, vehicle is unloaded (mass_empty) at the start of each route profile. No results are kept in
+        memory, evaluation parameters of all chunks are accumulated in self.kpi
+
+        Parameters
+        ----------
+        sink: callable. Called with DataFrame of result columns for each chunk, indexed by simulation timestep,
+            None to accumulate evaluation parameters only
+        chunk_size: int [s]. Number of timesteps per chunk
+        profiles: iterable of DataFrames or CompactProfiles. Route profiles (e.g. one per shift),
+            None for route profile of simulation
+        reset: bool. Start from initial component states (see reset_state), False to continue from component states
+            of previous simulation (e.g. next week of operation)
+
+        Returns
+        -------
+        int: number of simulated timesteps
+        '''
+        if profiles is None:
+            profiles = [self.route.profile_day]
+
+        self.record_start()
+        if reset:
+            self.reset_state()
+        self.start()
+
+        self.kpi.reset()
+        time = 0
+        for profile in profiles:
+            # Vehicle is unloaded at recycling hub before each route profile
+            self.vehicle.mass_cum = self.vehicle.mass_empty
+
+            for start in range(0, len(profile), chunk_size):
+                if isinstance(profile, CompactProfile):
+                    chunk = profile.slice(start, start+chunk_size)
+                else:
+                    chunk = profile.iloc[start:(start+chunk_size)]
+                results = self.calculate_vectorized(chunk)
+                if sink is not None:
+                    sink(results.to_dataframe(index=pd.RangeIndex(time, time+results.length, name='time')))
+                time += results.length
+
+        self.record_end(time)
+
+        return time
+
+
+    def simulate_adaptive(self, power_tolerance=0., expand=False):
+        '''
+        Adaptive simulation method for long segments of constant power (wait, loader, cruise and charge phases):
+            route profile is run length encoded into segments of constant inputs (Route.get_segments)
+            vehicle and battery management are evaluated once per segment
+            consecutive segments with power within power_tolerance are merged (mean power)
+            battery is advanced in closed form over merged segments (Battery.calculate_segments)
+        Segment results are stored in results_segments (power flows: mean of segment, states: last timestep of
+        segment) and segments (time, duration, phase_type), KPIs in self.kpi. error_bound holds the bound of battery
+        energy [Wh] and state of charge [1] deviation versus simulation with single timesteps, caused by merged
+        segments of different power (battery efficiency depends on power), boundary clipping is not included
+
+        Parameters
+        ----------
+        power_tolerance: float [W]. Maximum range of battery management power (diesel: vehicle diesel power)
+            within merged segments, 0 merges only segments of equal power (exact up to rounding)
+        expand: bool. Expand segment results to single timesteps as results (power flows constant within segment),
+            results are then up to date (needs_update False)
+        '''
+        self.record_start()
+        self.reset_state()
+        self.start()
+        self.kpi.reset()
+
+        segments = self.route.get_segments(self.route.profile_day)
+        duration = segments['duration'].to_numpy()
+        phase_type = segments['phase_type'].to_numpy()
+
+        ## Vehicle and battery management per segment, battery over merged segments
+        components = self.graph.calculate_vectorized(segments, exclude=set(self.components_skipped) | {'battery'})
+        vehicle = components['vehicle']
+        if self.components_skipped:
+            power = vehicle['power_diesel']
+        else:
+            # Battery input power
+            power = sum(components[name]['power'] for name in self.graph.inputs['battery'])
+
+        start = self.merge_segments(power, phase_type, power_tolerance)
+        end = np.append(start[1:], len(power)) - 1
+        duration_merged = np.add.reduceat(duration, start) if len(start) else duration
+
+        def mean(values):
+            # Mean of merged segments, weighted by duration
+            if not len(start):
+                return values
+            return np.add.reduceat(values * duration, start) / duration_merged
+
+        ## Initialization of result recorder to store segment results
+        results = Recorder(columns=self.result_columns,
+                           length=len(start))
+        results['vehicle_mass_cum'] = vehicle['mass_cum'][end]
+        results['vehicle_power_drive'] = mean(vehicle['power_drive'])
+        results['vehicle_power_loader'] = mean(vehicle['power_loader_motor'])
+        results['vehicle_power_motor'] = mean(vehicle['power_motor'])
+        results['vehicle_power_electric'] = mean(vehicle['power_electric'])
+        results['vehicle_power_diesel'] = mean(vehicle['power_diesel'])
+        results['vehicle_efficiency_drivetrain'] = mean(vehicle['eta_drivetrain'])
+
+        self.error_bound = {'energy_battery': 0., 'state_of_charge': 0.}
+        ## Diesel: electric chain is not simulated
+        if self.components_skipped:
+            self.clear_electric_results(results)
+        else:
+            ## BMS
+            battery_management = components['battery_management']
+            results['battery_management_power'] = mean(battery_management['power'])
+            results['battery_management_efficiency'] = mean(battery_management['efficiency'])
+            ## Battery
+            power_merged = mean(power)
+            self.write_battery(results, self.battery.calculate_segments(power_merged, duration_merged))
+
+            # Battery energy of segments versus battery energy of mean power of merged segments [Wh]
+            if len(start):
+                energy_segments = np.add.reduceat(self.battery.get_power_battery(power) * duration, start)
+                energy_merged = self.battery.get_power_battery(power_merged) * duration_merged
+                energy_deviation = np.abs(energy_segments - energy_merged).sum() * self.timestep / 3600
+                self.error_bound = {'energy_battery': energy_deviation,
+                                    'state_of_charge': energy_deviation / self.battery.capacity_current_wh}
+
+        ## Added components
+        for name in self.components_added:
+            if name in components:
+                results[self.power_columns[name]] = mean(components[name]['power'])
+
+        self.segments = pd.DataFrame({'time': segments['time'].to_numpy()[start],
+                                      'duration': duration_merged,
+                                      'phase_type': phase_type[start]})
+        self.results_segments = results
+        self.kpi.update(results, self.segments, duration_merged)
+
+        # Segment results as single timesteps
+        if expand:
+            self.results = Recorder(columns=self.result_columns,
+                                    length=int(duration_merged.sum()))
+            self.results.data[:] = np.repeat(results.data, duration_merged, axis=1)
+            self.link_results()
+            self.needs_update = False
+
+        self.record_end(int(duration_merged.sum()))
+
+
+    def merge_segments(self, power, phase_type, power_tolerance=0.):
+        '''
+        Method merges consecutive segments of equal phase type and power sign (charge/discharge) with power range
+        (maximum - minimum) within power_tolerance
+
+        Parameters
+        ----------
+        power: array [W]. Power of segments
+        phase_type: array. Phase type of segments
+        power_tolerance: float [W]. Maximum power range of merged segments
+
+        Returns
+        -------
+        array of int: index of first segment of each merged segment
+        '''
+        start = np.ones(len(power), dtype=bool)
+        if power_tolerance <= 0:
+            start[1:] = (power[1:] != power[:-1]) | (phase_type[1:] != phase_type[:-1])
+            return np.flatnonzero(start)
+
+        power_min = power_max = power[0] if len(power) else 0.
+        for i in range(1, len(power)):
+            power_min = min(power_min, power[i])
+            power_max = max(power_max, power[i])
+            if power_max - power_min > power_tolerance or phase_type[i] != phase_type[i-1] \
+               or np.sign(power[i]) != np.sign(power[i-1]):
+                power_min = power_max = power[i]
+            else:
+                start[i] = False
+
+        return np.flatnonzero(start)
+
+
+    def reset_state(self):
+        '''
+        Method resets component states to initial states, so results do not depend on previous simulations:
+        vehicle is unloaded (mass_empty), battery state of charge, temperature and power loss are reset
+
+        Parameters
+        ----------
+        None
+        '''
+        self.vehicle.mass_cum = self.vehicle.mass_empty
+        self.battery.reset_state()
+
+
+    def calculate_vectorized(self, profile):
+        '''
+        Method calculates all components with vectorized models for a route profile (or part of it)
+        Components start from their current state and keep their state afterwards, results are added to self.kpi
+
+        Parameters
+        ----------
+        profile: DataFrame. Route profile
+
+        Returns
+        -------
+        Recorder: simulation results of route profile
+        '''
+        ## Initialization of result recorder to store simulation results
+        results = Recorder(columns=self.result_columns,
+                           length=len(profile))
+
+        components = self.graph.calculate_vectorized(profile, exclude=self.components_skipped)
+
+        ## Vehicle
+        vehicle = components['vehicle']
+        results['vehicle_mass_cum'] = vehicle['mass_cum']
+        results['vehicle_power_drive'] = vehicle['power_drive']
+        results['vehicle_power_loader'] = vehicle['power_loader_motor']
+        results['vehicle_power_motor'] = vehicle['power_motor']
+        results['vehicle_power_electric'] = vehicle['power_electric']
+        results['vehicle_power_diesel'] = vehicle['power_diesel']
+        results['vehicle_efficiency_drivetrain'] = vehicle['eta_drivetrain']
+        ## Diesel: electric chain is not simulated
+        if self.components_skipped:
+            self.clear_electric_results(results)
+        else:
+            ## BMS
+            battery_management = components['battery_management']
+            results['battery_management_power'] = battery_management['power']
+            results['battery_management_efficiency'] = battery_management['efficiency']
+            ## Battery
+            self.write_battery(results, components['battery'])
+
+        ## Added components
+        for name in self.components_added:
+            if name in components:
+                results[self.power_columns[name]] = components[name]['power']
+
+        self.kpi.update(results, profile)
+
+        return results
+
+
+    def calculate_battery(self, results):
+        '''
+        Method calculates battery results with the battery kernel from input power of results (battery management
+        power, summed with components added to battery input)
+
+        Parameters
+        ----------
+        results: Recorder. Simulation results with battery input power, battery columns are written
+        '''
+        self.write_battery(results, self.battery.calculate_vectorized(self.get_input_power(results, 'battery')))
+
+
+    def get_input_power(self, results, name):
+        '''
+        Method returns input power of a component: sum of output power columns of its inputs in component graph
+
+        Parameters
+        ----------
+        results: Recorder. Simulation results
+        name: str. Component name
+        '''
+        inputs = self.graph.inputs[name]
+        if len(inputs) == 1:
+            return results[self.power_columns[inputs[0]]]
+
+        return sum(results[self.power_columns[input_name]] for input_name in inputs)
+
+
+    def write_battery(self, results, battery):
+        '''
+        Method writes vectorized battery results to result recorder
+
+        Parameters
+        ----------
+        results: Recorder. Simulation results
+        battery: dict. Results of Battery.calculate_vectorized
+        '''
+        results['battery_power'] = battery['power_battery']
+        results['battery_efficiency'] = battery['efficiency']
+        results['battery_power_loss'] = battery['power_loss']
+        results['battery_state_of_charge'] = battery['state_of_charge']
+        results['battery_temperature'] = battery['temperature']
+
+
+    def clear_electric_results(self, results):
+        '''
+        Method sets results of not simulated electric chain (diesel vehicle):
+        zero power and efficiency, battery state of charge and temperature are not defined (NaN)
+
+        Parameters
+        ----------
+        results: Recorder. Simulation results
+        '''
+        for column in self.result_columns:
+            if column.startswith('battery'):
+                results[column] = 0.
+        for name in self.components_added:
+            if name in self.components_skipped:
+                results[self.power_columns[name]] = 0.
+        results['battery_state_of_charge'] = np.nan
+        results['battery_temperature'] = np.nan
+
+
+    def simulate_battery(self):
+        '''
+        Vectorized battery simulation method, which recalculates all battery results with the battery kernel
+        from the stored battery management power, vehicle and battery management are not calculated again
+        Battery starts from its current state, e.g. a new battery of set_battery_parameters
+
+        Parameters
+        ----------
+        None
+        '''
+        self.calculate_battery(self.results)
+        # Evaluation parameters of new battery results
+        self.kpi.reset()
+        self.kpi.update(self.results, self.route.profile_day)
+        self.link_results()
+
+
+    def set_battery_parameters(self, parameters):
+        '''
+        Method replaces the battery by a new battery with given parameters overriding values of json file
+        Battery results need to be recalculated afterwards e.g. with simulate_battery
+
+        Parameters
+        ----------
+        parameters: dict. Battery parameters, e.g. {'capacity_nominal_wh': 250000.}
+        '''
+        self.parameters['battery'] = dict(parameters)
+        self.battery = Battery(timestep=self.timestep,
+                               input_link=self.battery_management,
+                               file_path='data/components/battery_lfp.json',
+                               parameters=self.parameters['battery'])
+        self.battery.event_log = self.event_log
+        self.graph.replace('battery', self.battery)
+        self.childs = self.graph.get_components(exclude=self.components_skipped)
+
+
+    def add_component(self, name, component, inputs=(), outputs=()):
+        '''
+        Method adds a component (e.g. DC/DC converter, auxiliary load) to the component graph
+        Component is simulated in step and vectorized simulation in topological order, its output power is recorded
+        as result column <name>_power. Diesel vehicle: components supplied by the electric chain are not simulated
+
+        Parameters
+        ----------
+        name: str. Component name
+        component: class. Simulatable component with calculate and calculate_vectorized methods and output power
+        inputs: list of str. Names of components which supply input power, empty for source components (route profile)
+        outputs: list of str. Names of components supplied by the component (see ComponentGraph.add), e.g.
+            inputs=['vehicle'], outputs=['battery_management'] inserts a DC/DC converter between vehicle and BMS,
+            outputs=['battery_management'] adds an auxiliary load to BMS input
+        '''
+        self.graph.add(name, component, inputs, outputs)
+        component.event_log = self.event_log
+        if not inputs:
+            component.input_link = self.route.profile_day
+
+        self.components_added.append(name)
+        self.power_columns = dict(self.power_columns, **{name: name + '_power'})
+        self.result_columns = self.result_columns + [name + '_power']
+        if self.components_skipped:
+            self.components_skipped = self.graph.get_dependents(self.electric_components)
+
+        self.childs = self.graph.get_components(exclude=self.components_skipped)
+        self.needs_update = True
+
+
+    def record_start(self):
+        '''
+        Method clears event log and records simulation start (wall clock time as value)
+
+        Parameters
+        ----------
+        None
+        '''
+        self.event_log.clear()
+        self.event_log.record('simulation', 'start', 0, datetime.today().timestamp(), level='info')
+
+
+    def record_end(self, timesteps):
+        '''
+        Method records simulation end (wall clock time as value) and emits aggregated component warnings
+
+        Parameters
+        ----------
+        timesteps: int. Number of simulated timesteps
+        '''
+        self.event_log.record('simulation', 'end', timesteps, datetime.today().timestamp(), level='info')
+        self.event_log.emit()
+
+
+    def get_profiling_summary(self):
+        '''
+        Method returns profiling results of all components of step simulation (see Simulatable.enable_profiling):
+        number of calls, cumulative time and time per call of calculate, branch counters
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: one row per profiled component, empty if profiling was not enabled
+        '''
+        summary = list()
+        counters = list()
+        for name in self.graph.get_order():
+            profiling = self.graph.components[name].profiling
+            if profiling is None:
+                continue
+            row = {'component': name,
+                   'calls': profiling['calls'],
+                   'time': profiling['time'],
+                   'time_per_call_us': profiling['time'] / profiling['calls'] * 1e6 if profiling['calls'] else 0.}
+            row.update(profiling['counters'])
+            summary.append(row)
+            counters.extend(counter for counter in profiling['counters'] if counter not in counters)
+
+        summary = pd.DataFrame(summary, columns=['component', 'calls', 'time', 'time_per_call_us'] + counters)
+        summary = summary.set_index('component')
+        # Branches not reached by a component are counted with zero
+        summary[counters] = summary[counters].fillna(0).astype(int)
+
+        return summary
+
+
+    def link_results(self):
+        '''
+        Method links all result columns of recorder as simulation attributes (views, no copy)
+        e.g. self.battery_state_of_charge
+
+        Parameters
+        ----------
+        None
+        '''
+        # Timeindex
+        self.timeindex = range(self.results.length)
+        for column in self.result_columns:
+            setattr(self, column, self.results[column])
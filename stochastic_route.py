@@ -0,0 +1,315 @@
+import argparse
+import contextlib
+import copy
+import io
+import math
+
+import numpy as np
+import pandas as pd
+
+from components.route import Route
+from simulation import Simulation
+from evaluation import get_results_parameter
+
+
+# Default per stop distributions, mean values are taken from tour data:
+#   distance: distance to next stop [m], containers: number of containers [1], container_mass: mean mass of
+#   containers of stop [kg]
+default_distributions = {'distance': {'distribution': 'gamma', 'cv': 0.5},
+                         'containers': {'distribution': 'poisson'},
+                         'container_mass': {'distribution': 'normal', 'cv': 0.25}}
+
+
+def sample_distribution(rng, distribution, mean, size):
+    '''
+    Samples values of a distribution with given mean and coefficient of variation (cv)
+
+    Parameters
+    ----------
+    rng: numpy Generator. Random number generator
+    distribution: dict. distribution (constant, normal, lognormal, gamma, uniform or poisson) and cv [1]
+        normal: standard deviation cv * |mean|, clipped at 0 for positive mean
+        poisson: 1 + Poisson(mean - 1), at least one (e.g. container per stop), cv is not used
+    mean: float. Mean value
+    size: tuple. Shape of sampled array
+
+    Returns
+    -------
+    array: sampled values
+    '''
+    name = distribution['distribution']
+    cv = distribution.get('cv', 0.)
+
+    if name == 'constant' or (cv == 0 and name != 'poisson'):
+        return np.full(size, float(mean))
+    elif name == 'normal':
+        values = rng.normal(mean, cv * abs(mean), size)
+        return np.maximum(values, 0.) if mean > 0 else values
+    elif name == 'lognormal':
+        sigma = math.sqrt(math.log(1 + cv**2))
+        return rng.lognormal(math.log(mean) - sigma**2 / 2, sigma, size)
+    elif name == 'gamma':
+        return rng.gamma(1 / cv**2, mean * cv**2, size)
+    elif name == 'uniform':
+        return rng.uniform(mean * (1 - math.sqrt(3) * cv), mean * (1 + math.sqrt(3) * cv), size)
+    elif name == 'poisson':
+        return 1 + rng.poisson(max(mean - 1, 0.), size)
+    else:
+        raise ValueError('Unknown distribution ' + name + ', use constant, normal, lognormal, gamma, uniform or poisson')
+
+
+class StochasticRoute:
+    '''
+    Stochastic route generator: work phases with varying stops
+    Distance to next stop, number of containers and container mass are sampled per stop from configurable
+    distributions (mean values of tour data). Variants are sampled as 2D arrays [variant, stop] and work phase
+    profiles of all variants are built at once with array operations. Each stop follows the phases of
+    Route.workphase_cycle (wait, loader, acceleration, constant speed and braking to standstill), loader time depends
+    on number of containers. Drive phases to and from collection (and charge phase) are identical for all variants
+
+    Attributes
+    ----------
+    data_route: dict. Tour data (see Simulation), mean values of stops
+    distributions: dict. Per stop distributions of distance, containers and container_mass (see default_distributions)
+    rng: numpy Generator. Random number generator
+    route: Route. Route of tour data, route parameters and drive phases
+
+    Methods
+    -------
+    sample
+    get_workphases
+    get_profiles
+    simulate
+    get_summary
+    '''
+
+    def __init__(self, data_route, distributions=None, seed=None,
+                 file_path='data/components/route_profile.json', parameters=None):
+        '''
+        Parameters
+        ----------
+        data_route: dict. Tour data (see Simulation)
+        distributions: dict. Per stop distributions overriding default_distributions
+        seed: int. Seed of random number generator
+        file_path: json file. Route parameter file
+        parameters: dict. Route parameters overriding values of json file
+        '''
+        self.data_route = data_route
+        self.distributions = dict(default_distributions, **(distributions or {}))
+        self.rng = np.random.default_rng(seed)
+
+        self.route = Route(timestep=1, data_route=data_route, file_path=file_path, parameters=parameters)
+        self.profile_there = self.route.drivephase(data_route['distance_there'])
+        self.profile_back = self.route.drivephase(data_route['distance_back'])
+        self.profile_charge = self.route.chargephase(int(data_route['charge_duration'])) \
+                              if data_route.get('charge_duration', 0) > 0 else None
+
+
+    def sample(self, variants):
+        '''
+        Method samples stops of route variants
+
+        Parameters
+        ----------
+        variants: int. Number of route variants
+
+        Returns
+        -------
+        dict of 2D arrays [variant, stop]: distance to next stop [m] (0 for last stop), containers [1],
+            container_mass [kg] (mean mass of containers of stop)
+        '''
+        stops = self.data_route['stops_sum']
+        distance = np.zeros((variants, stops))
+        distance[:, :-1] = sample_distribution(self.rng, self.distributions['distance'],
+                                               self.data_route['distance_collection'] / (stops - 1),
+                                               (variants, stops - 1))
+        containers = sample_distribution(self.rng, self.distributions['containers'],
+                                         self.data_route['containers_sum'] / stops, (variants, stops))
+        container_mass = sample_distribution(self.rng, self.distributions['container_mass'],
+                                             self.data_route['container_mass'], (variants, stops))
+
+        return {'distance': distance,
+                'containers': containers,
+                'container_mass': container_mass}
+
+
+    def get_workphases(self, stops):
+        '''
+        Method builds work phase profiles of all route variants at once
+
+        Parameters
+        ----------
+        stops: dict of 2D arrays. Sampled stops (see sample)
+
+        Returns
+        -------
+        list of DataFrames: work phase profile of each variant
+        '''
+        route = self.route
+        distance = stops['distance'].ravel()
+        containers = stops['containers'].ravel()
+        mass = (stops['containers'] * stops['container_mass']).ravel()
+        variants = stops['distance'].shape[0]
+
+        ## Acceleration template of Route.workphase_cycle: speed and distance after each acceleration timestep
+        t_a = math.ceil(route.speed_max / route.acceleration_const)
+        speed_a = np.minimum(route.acceleration_const * route.timestep * np.arange(1, t_a + 1), route.speed_max)
+        distance_a = np.cumsum(0.5 * np.diff(speed_a, prepend=0.) * route.timestep**2
+                               + np.concatenate(([0.], speed_a[:-1])) * route.timestep)
+
+        ## Phase durations of each stop [s]
+        t_wait = np.full(len(distance), route.t_wait)
+        t_loader = np.ceil(route.t_hydraulic * containers).astype(int)
+        # Acceleration until half of stop distance or maximum speed
+        t_accel = np.where(distance > 0, 1 + np.searchsorted(distance_a[:-1], distance / 2, side='left'), 0)
+        speed_accel = np.where(t_accel > 0, speed_a[np.maximum(t_accel - 1, 0)], 0.)
+        distance_accel = np.where(t_accel > 0, distance_a[np.maximum(t_accel - 1, 0)], 0.)
+        # Constant speed until braking distance of Route.workphase_cycle
+        distance_cruise = distance - (58.8 + 8.33)
+        distance_first = distance_accel + speed_accel * route.timestep
+        t_cruise = np.where((t_accel > 0) & (distance_accel < distance_cruise),
+                            1 + np.ceil(np.maximum(distance_cruise - distance_first, 0) / (route.speed_max * route.timestep)),
+                            0).astype(int)
+        # Braking to standstill
+        speed_brake = np.where(t_cruise > 0, route.speed_max, speed_accel)
+        t_brake = np.ceil(np.round(speed_brake / (route.acceleration_const * route.timestep), 9)).astype(int)
+
+        ## Timesteps of all stops: phase (0 wait, 1 loader, 2 acceleration, 3 constant speed, 4 braking), stop and
+        ## timestep within phase
+        durations = np.column_stack((t_wait, t_loader, t_accel, t_cruise, t_brake)).ravel()
+        phase = np.repeat(np.tile(np.arange(5), len(distance)), durations)
+        stop = np.repeat(np.repeat(np.arange(len(distance)), 5), durations)
+        step = np.arange(len(phase)) - np.repeat(np.cumsum(durations) - durations, durations)
+
+        speed = np.select([phase == 2, phase == 3, phase == 4],
+                          [speed_a[np.minimum(step, t_a - 1)],
+                           route.speed_max,
+                           np.maximum(speed_brake[stop] - route.acceleration_const * route.timestep * (step + 1), 0.)],
+                          default=0.)
+        # Each stop starts and ends at standstill
+        acceleration = np.diff(speed, prepend=0.)
+        speed_previous = speed - acceleration
+        distance_step = 0.5 * acceleration * route.timestep**2 + speed_previous * route.timestep
+        distance_cum = np.cumsum(distance_step)
+        stop_start = np.cumsum(durations.reshape(-1, 5).sum(axis=1))
+        stop_offset = np.concatenate(([0.], distance_cum[stop_start[:-1] - 1]))
+        loader_active = (phase == 1).astype(float)
+        container_mass = np.where(phase == 1, mass[stop] / np.maximum(t_loader[stop], 1), 0.)
+
+        workphase = pd.DataFrame({'speed': speed,
+                                  'acceleration': acceleration,
+                                  'distance': distance_cum - stop_offset[stop],
+                                  'loader_active': loader_active,
+                                  'container_mass': container_mass,
+                                  'phase_type': np.full(len(speed), 2.),
+                                  'charger_power': np.zeros(len(speed))})
+
+        # Split into variants
+        variant_end = stop_start.reshape(variants, -1)[:, -1]
+        variant_start = np.concatenate(([0], variant_end[:-1]))
+        return [workphase.iloc[start:end].reset_index(drop=True) for start, end in zip(variant_start, variant_end)]
+
+
+    def get_profiles(self, variants):
+        '''
+        Method samples route variants and returns routes with route profiles
+
+        Parameters
+        ----------
+        variants: int. Number of route variants
+
+        Returns
+        -------
+        list of Routes: route of each variant with profile_day and data_route of sampled stops
+        dict of 2D arrays: sampled stops (see sample)
+        '''
+        stops = self.sample(variants)
+        routes = list()
+        for i, workphase in enumerate(self.get_workphases(stops)):
+            phases = [self.profile_there, workphase, self.profile_back]
+            if self.profile_charge is not None:
+                phases.append(self.profile_charge)
+
+            route = copy.copy(self.route)
+            route.profile_day = pd.concat(phases, ignore_index=True)
+            route.data_route = dict(self.data_route,
+                                    distance_collection=stops['distance'][i].sum(),
+                                    containers_sum=stops['containers'][i].sum())
+            route.data_route['overall_distance'] = route.data_route['distance_there'] \
+                                                   + route.data_route['distance_collection'] \
+                                                   + route.data_route['distance_back']
+            routes.append(route)
+
+        return routes, stops
+
+
+    def simulate(self, variants, vehicle_file='data/components/vehicle_electric.json', parameters=None,
+                 batch_size=100):
+        '''
+        Method simulates route variants with the vectorized simulation, variants are generated in batches
+
+        Parameters
+        ----------
+        variants: int. Number of route variants
+        vehicle_file: json file. Vehicle parameter file
+        parameters: dict. Component parameters overriding values of json files (see Simulation)
+        batch_size: int. Number of route variants generated at once
+
+        Returns
+        -------
+        DataFrame: evaluation parameters of each variant (see get_results_parameter)
+        '''
+        results = list()
+        for start in range(0, variants, batch_size):
+            routes, stops = self.get_profiles(min(batch_size, variants - start))
+            for route in routes:
+                with contextlib.redirect_stdout(io.StringIO()):
+                    sim = Simulation(route.data_route, vehicle_file=vehicle_file, parameters=parameters, route=route)
+                    sim.simulate_vectorized()
+                result = get_results_parameter(sim)
+                result['distance_collection'] = route.data_route['distance_collection']
+                result['containers_sum'] = route.data_route['containers_sum']
+                result['timesteps'] = sim.kpi.timesteps
+                results.append(result)
+
+        return pd.DataFrame(results).rename_axis('variant')
+
+
+    def get_summary(self, results, percentiles=(50, 95)):
+        '''
+        Method returns energy demand distribution of simulated route variants
+
+        Parameters
+        ----------
+        results: DataFrame. Results of simulate
+        percentiles: list of int. Percentiles of energy consumption
+
+        Returns
+        -------
+        dict: percentiles of energy consumption [Wh] and specific energy [Wh/m] (energy_consumption_p50, ...),
+            minimum and 5th percentile of final state of charge [1] (electric vehicles)
+        '''
+        summary = {'variants': len(results)}
+        for percentile in percentiles:
+            summary['energy_consumption_p' + str(percentile)] = np.percentile(results['energy_consumption'], percentile)
+            if 'energy_per_km' in results:
+                summary['energy_per_km_p' + str(percentile)] = np.percentile(results['energy_per_km'], percentile)
+        if 'battery_soc_end' in results:
+            summary['battery_soc_end_min'] = results['battery_soc_end'].min()
+            summary['battery_soc_end_p5'] = np.percentile(results['battery_soc_end'], 5)
+
+        return summary
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Energy demand distribution of stochastic route variants')
+    parser.add_argument('--tour', default='data/load/tour.pkl', help='Pickled route parameters')
+    parser.add_argument('--vehicle', default='data/components/vehicle_electric.json')
+    parser.add_argument('--variants', type=int, default=100)
+    parser.add_argument('--seed', type=int, default=None)
+    arguments = parser.parse_args()
+
+    stochastic_route = StochasticRoute(pd.read_pickle(arguments.tour), seed=arguments.seed)
+    results = stochastic_route.simulate(arguments.variants, vehicle_file=arguments.vehicle)
+    for key, value in stochastic_route.get_summary(results).items():
+        print(key, value)
@@ -0,0 +1,206 @@
+import itertools
+import json
+import math
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import numpy as np
+import pandas as pd
+
+import data_loader
+import profile_cache
+from simulation import Simulation
+from evaluation import get_results_parameter
+from batch import init_worker
+
+
+# Simulation components with parameters, in order of power flow
+sweep_components = ['route', 'vehicle', 'battery_management', 'battery']
+
+
+def get_component_parameters(point):
+    '''
+    Splits sweep point {'component.attribute': value} into component parameters {component: {attribute: value}}
+
+    Parameters
+    ----------
+    point: dict. Sweep point with parameter names 'component.attribute'
+    '''
+    parameters = {component: dict() for component in sweep_components}
+    for name, value in point.items():
+        component, attribute = name.split('.', 1)
+        if component not in parameters:
+            raise ValueError('Unknown component in sweep parameter ' + name + ', use one of ' + str(sweep_components))
+        # Numpy scalars are converted for json compatible parameters
+        parameters[component][attribute] = value.item() if isinstance(value, np.generic) else value
+
+    return parameters
+
+
+def simulate_points(task):
+    '''
+    Simulates sweep points of one task, consecutive points reuse all results which are not affected:
+        same route parameters: route profile is reused
+        same route, vehicle and battery management parameters: only battery is recalculated
+
+    Parameters
+    ----------
+    task: tuple. (data_route, vehicle_file, [(index, point), ...])
+
+    Returns
+    -------
+    list of dicts: point index, sweep parameters and evaluation parameters
+    '''
+    data_route, vehicle_file, points = task
+
+    results = list()
+    sim = None
+    for index, point in points:
+        parameters = get_component_parameters(point)
+
+        # Battery only change, vehicle and battery management power series are reused
+        if sim is not None and all(parameters[component] == sim.parameters.get(component, {})
+                                   for component in ['route', 'vehicle', 'battery_management']):
+            sim.set_battery_parameters(parameters['battery'])
+            sim.simulate_battery()
+
+        else:
+            # Route profile is reused for unchanged route parameters, otherwise taken from profile cache
+            route = sim.route if sim is not None and parameters['route'] == sim.parameters.get('route', {}) else None
+            sim = Simulation(data_route, vehicle_file=vehicle_file, parameters=parameters, route=route,
+                             profile_cache=profile_cache.default_cache)
+            sim.simulate_vectorized()
+
+        results_parameter = {'point': index}
+        results_parameter.update(point)
+        results_parameter.update(get_results_parameter(sim))
+        results.append(results_parameter)
+
+    return results
+
+
+class Sweep:
+    '''
+    Parameter sweep (design space exploration) over component parameters of Simulation
+    Parameters are named 'component.attribute' with component route, vehicle, battery_management or battery,
+    e.g. 'battery.capacity_nominal_wh', 'vehicle.power_motor_max', 'vehicle.power_hydraulic_mean'
+
+    Attributes
+    ----------
+    data_route: dict. Route parameters (see Simulation)
+    points: list of dicts. Sweep points {'component.attribute': value}
+    vehicle_file: json file. Vehicle parameter file
+    max_workers: int. Number of worker processes, None for number of CPUs, 1 to simulate in current process
+
+    Methods
+    -------
+    grid
+    latin_hypercube
+    get_tasks
+    simulate
+    '''
+
+    def __init__(self, data_route, points, vehicle_file='data/components/vehicle_electric.json', max_workers=None):
+        '''
+        Parameters
+        ----------
+        data_route: dict. Route parameters (see Simulation)
+        points: list of dicts. Sweep points, e.g. created with Sweep.grid or Sweep.latin_hypercube
+        vehicle_file: json file. Vehicle parameter file
+        max_workers: int. Number of worker processes
+        '''
+        self.data_route = data_route
+        self.points = list(points)
+        self.vehicle_file = vehicle_file
+        self.max_workers = max_workers if max_workers else os.cpu_count()
+
+
+    @staticmethod
+    def grid(parameters):
+        '''
+        Full factorial grid of parameter values
+
+        Parameters
+        ----------
+        parameters: dict. {'component.attribute': list of values}
+
+        Returns
+        -------
+        list of dicts: sweep points
+        '''
+        names = list(parameters)
+        return [dict(zip(names, values)) for values in itertools.product(*[parameters[name] for name in names])]
+
+
+    @staticmethod
+    def latin_hypercube(bounds, samples, seed=None):
+        '''
+        Latin hypercube samples of parameter values, each parameter range is divided in samples equally likely intervals
+
+        Parameters
+        ----------
+        bounds: dict. {'component.attribute': (lower bound, upper bound)}
+        samples: int. Number of sweep points
+        seed: int. Seed of random number generator
+
+        Returns
+        -------
+        list of dicts: sweep points
+        '''
+        rng = np.random.default_rng(seed)
+        points = [dict() for i in range(samples)]
+        for name, (lower, upper) in bounds.items():
+            # One sample in each interval, intervals are shuffled for each parameter
+            values = lower + (upper - lower) * (rng.permutation(samples) + rng.random(samples)) / samples
+            for point, value in zip(points, values):
+                point[name] = float(value)
+
+        return points
+
+
+    def get_tasks(self):
+        '''
+        Method sorts sweep points by route, vehicle and battery management parameters
+        and splits them into one task per worker, so consecutive points reuse results
+
+        Parameters
+        ----------
+        None
+        '''
+        def key(indexed_point):
+            parameters = get_component_parameters(indexed_point[1])
+            return [json.dumps(parameters[component], sort_keys=True) for component in sweep_components[:-1]]
+
+        points = sorted(enumerate(self.points), key=key)
+        chunksize = max(1, math.ceil(len(points) / self.max_workers))
+
+        return [(self.data_route, self.vehicle_file, points[i:i+chunksize]) for i in range(0, len(points), chunksize)]
+
+
+    def simulate(self):
+        '''
+        Method simulates all sweep points, distributed over worker processes
+
+        Parameters
+        ----------
+        None
+
+        Returns
+        -------
+        DataFrame: one row per sweep point with sweep parameters and evaluation parameters
+        '''
+        tasks = self.get_tasks()
+
+        # Route profile cache and drive cycle store settings of current process are used by worker processes
+        initargs = ([self.vehicle_file], profile_cache.default_cache.directory, data_loader.drivecycle_store.persist)
+        if self.max_workers == 1:
+            init_worker(*initargs)
+            results = [simulate_points(task) for task in tasks]
+
+        else:
+            with ProcessPoolExecutor(max_workers=self.max_workers,
+                                     initializer=init_worker,
+                                     initargs=initargs) as executor:
+                results = list(executor.map(simulate_points, tasks))
+
+        return pd.DataFrame(list(itertools.chain.from_iterable(results))).set_index('point').sort_index()
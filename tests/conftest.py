@@ -0,0 +1,20 @@
+import os
+import sys
+
+import pandas as pd
+import pytest
+
+# Simulation modules and component files are addressed relative to repository root
+root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, root)
+
+
+@pytest.fixture(autouse=True)
+def repository_root(monkeypatch):
+    monkeypatch.chdir(root)
+
+
+@pytest.fixture
+def data_route():
+    # Sample tour of repository
+    return pd.read_pickle(os.path.join(root, 'data', 'load', 'tour.pkl'))
@@ -0,0 +1,58 @@
+import numpy as np
+import pandas as pd
+
+from simulation import Simulation
+from compact_profile import CompactProfile
+from capacity_solver import CapacitySolver
+
+
+# Simulation result attributes of step and vectorized simulation
+result_columns = ['vehicle_mass_cum', 'vehicle_power_drive', 'vehicle_power_loader', 'vehicle_power_motor',
+                  'vehicle_power_electric', 'vehicle_power_diesel', 'vehicle_efficiency_drivetrain',
+                  'battery_management_power', 'battery_management_efficiency',
+                  'battery_power', 'battery_efficiency', 'battery_power_loss', 'battery_state_of_charge',
+                  'battery_temperature']
+
+
+def test_vectorized_equals_step(data_route):
+    sim_step = Simulation(data_route)
+    sim_step.simulate()
+    sim_vectorized = Simulation(data_route)
+    sim_vectorized.simulate_vectorized()
+
+    # Equal up to rounding of summation order (relative deviation ~1e-13)
+    for column in result_columns:
+        np.testing.assert_allclose(getattr(sim_vectorized, column), getattr(sim_step, column),
+                                   rtol=1e-12, atol=1e-12, err_msg=column)
+
+
+def test_adaptive_equals_vectorized(data_route):
+    sim_vectorized = Simulation(data_route)
+    sim_vectorized.simulate_vectorized()
+    sim_adaptive = Simulation(data_route, route=sim_vectorized.route)
+    sim_adaptive.simulate_adaptive(power_tolerance=0.)
+
+    # Only segments of equal power are merged: error bound is zero up to rounding
+    assert sim_adaptive.error_bound['energy_battery'] < 1e-9
+    assert sim_adaptive.kpi.timesteps == sim_vectorized.kpi.timesteps
+    for kpi in ['energy_motor', 'energy_loader', 'energy_recuperation', 'energy_consumption',
+                'state_of_charge_end']:
+        np.testing.assert_allclose(getattr(sim_adaptive.kpi, kpi), getattr(sim_vectorized.kpi, kpi),
+                                   rtol=1e-9, err_msg=kpi)
+
+
+def test_compact_profile_lossless(data_route):
+    profile = Simulation(data_route).route.profile_day
+    compact = CompactProfile(profile)
+
+    pd.testing.assert_frame_equal(compact.to_dataframe(), profile)
+    assert compact.nbytes < profile.memory_usage(index=False).sum()
+
+
+def test_capacity_solver_minimum(data_route):
+    solver = CapacitySolver(Simulation(data_route), tolerance=100.)
+    capacity = solver.solve()['capacity_nominal_wh']
+
+    # Feasible at minimum capacity, infeasible below by more than tolerance
+    assert solver.get_margin(capacity) > 0
+    assert solver.get_margin(capacity - solver.tolerance) <= 0